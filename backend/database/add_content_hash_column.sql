@@ -0,0 +1,8 @@
+-- Content hash for embedding change detection
+-- Run this in Supabase Dashboard → SQL Editor
+
+-- The embedding scripts store a SHA-256 of "name: description" alongside
+-- each embedding so re-runs can skip ingredients whose text hasn't
+-- changed instead of re-calling the OpenAI API for every row
+ALTER TABLE ingredients_library
+  ADD COLUMN IF NOT EXISTS content_hash text;
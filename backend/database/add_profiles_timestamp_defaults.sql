@@ -0,0 +1,12 @@
+-- Run this in Supabase SQL Editor to set timestamp defaults on profiles
+
+-- create_or_update_profile upserts without created_at so the database
+-- fills it on insert and leaves it untouched on update; that relies on
+-- these column defaults existing
+ALTER TABLE profiles
+ALTER COLUMN created_at SET DEFAULT now(),
+ALTER COLUMN updated_at SET DEFAULT now();
+
+-- Backfill any rows inserted before the default was in place
+UPDATE profiles SET created_at = now() WHERE created_at IS NULL;
+UPDATE profiles SET updated_at = now() WHERE updated_at IS NULL;
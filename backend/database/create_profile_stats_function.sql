@@ -0,0 +1,35 @@
+-- Profile With Stats Function
+-- Returns a user's profile together with scan history statistics in a
+-- single round trip instead of separate profile and scans queries
+-- Run this in Supabase Dashboard → SQL Editor
+
+-- Create the get_profile_with_stats function
+CREATE OR REPLACE FUNCTION get_profile_with_stats(
+  p_user_id text
+)
+RETURNS TABLE (
+  user_id text,
+  sensitivities jsonb,
+  created_at timestamptz,
+  updated_at timestamptz,
+  scan_count bigint,
+  last_scan_at timestamptz
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    profiles.user_id,
+    profiles.sensitivities,
+    profiles.created_at,
+    profiles.updated_at,
+    (SELECT COUNT(*) FROM scans WHERE scans.user_id = p_user_id) AS scan_count,
+    (SELECT MAX(scans.timestamp) FROM scans WHERE scans.user_id = p_user_id) AS last_scan_at
+  FROM profiles
+  WHERE profiles.user_id = p_user_id;
+END;
+$$;
+
+-- Test the function (optional)
+-- SELECT * FROM get_profile_with_stats('your-user-id');
@@ -4,25 +4,67 @@ Vaginal health RAG application using Supabase and LLM
 Production-ready with Sentry monitoring and request tracking
 """
 
+import itertools
 import logging
-import uuid
+import secrets
+import time
 from contextlib import asynccontextmanager
 from typing import Optional
-from datetime import datetime
-from fastapi import FastAPI, Request
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from config import settings
-from utils.supabase_client import initialize_supabase
+from utils.supabase_client import initialize_supabase, get_supabase_client
+from utils.timestamps import utc_now_iso
 from routers import scan, profiles, ingredients
 
-# Initialize Sentry for error tracking in production
-if settings.SENTRY_DSN and settings.ENVIRONMENT == 'production':
+# Root logging is configured by config.get_settings() when settings is
+# first imported above; re-running basicConfig here was a no-op that still
+# paid a getattr(logging, LOG_LEVEL) per import
+logger = logging.getLogger(__name__)
+
+# Default request_id for log records emitted outside a request context, so
+# the '[%(request_id)s]' log format never fails. Records logged with
+# extra={'request_id': ...} override it per call; the middleware no longer
+# mutates this per request (which was racy under concurrency anyway)
+logging.LogRecord.request_id = "-"
+
+# Snapshot per-request config once at import: these values never change at
+# runtime, so the middleware shouldn't repeat pydantic attribute lookups on
+# every request
+_ENABLE_REQUEST_LOGGING = settings.ENABLE_REQUEST_LOGGING
+_REQUEST_TIMEOUT_SECONDS = settings.REQUEST_TIMEOUT_SECONDS
+
+# Request IDs: random per-worker prefix + monotonic counter. Same uniqueness
+# guarantee as uuid4 for tracing purposes, without an os.urandom call and
+# UUID object allocation on every request
+_request_id_prefix = secrets.token_hex(8)
+_request_id_counter = itertools.count().__next__
+
+# Declared-size cap for scan uploads, enforced from the Content-Length
+# header before the multipart body is received. The handler's streaming
+# cap still guards clients that lie about (or omit) the header; the small
+# allowance covers multipart boundary/header framing around the file
+_MAX_SCAN_BODY_BYTES = scan.MAX_FILE_SIZE + 16 * 1024
+
+
+def _new_request_id() -> str:
+    """Generate a unique request ID for tracing"""
+    return f"{_request_id_prefix}-{_request_id_counter():x}"
+
+
+def _init_sentry() -> None:
+    """
+    Initialize Sentry error tracking (production only)
+    Imported lazily at startup so the SDK and its integrations stay off the
+    module import path for dev, tests, and deployments without a DSN
+    """
     try:
         import sentry_sdk
         from sentry_sdk.integrations.fastapi import FastApiIntegration
         from sentry_sdk.integrations.starlette import StarletteIntegration
-        
+
         sentry_sdk.init(
             dsn=settings.SENTRY_DSN,
             environment=settings.SENTRY_ENVIRONMENT or settings.ENVIRONMENT,
@@ -33,37 +75,64 @@ if settings.SENTRY_DSN and settings.ENVIRONMENT == 'production':
                 StarletteIntegration(),
             ]
         )
-        logger_initialized = logging.getLogger(__name__)
-        logger_initialized.info("✓ Sentry error tracking initialized")
+        logger.info("✓ Sentry error tracking initialized")
     except Exception as e:
-        logging.error(f"Failed to initialize Sentry: {e}")
-
-# Configure logging with production-safe defaults
-log_level = getattr(logging, settings.LOG_LEVEL, logging.INFO)
-logging.basicConfig(
-    level=log_level,
-    format='%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s'
-)
-logger = logging.getLogger(__name__)
+        logger.error(f"Failed to initialize Sentry: {e}")
 
 
-class RequestIDMiddleware:
+class RequestContextMiddleware:
     """
-    Middleware to add request ID tracking for distributed tracing
+    Fused per-request ASGI middleware: trusted-host enforcement (production
+    only) and request-ID extraction in a single pass over the raw headers,
+    instead of one middleware frame and one header iteration for each.
+    CORS stays with Starlette's middleware for correct preflight handling
     """
-    def __init__(self, app):
+
+    _ALLOWED_EXACT = (b"localhost", b"127.0.0.1")
+    _ALLOWED_SUFFIX = b".vercel.app"
+
+    def __init__(self, app, enforce_host: bool = False):
         self.app = app
-    
+        self.enforce_host = enforce_host
+
     async def __call__(self, scope, receive, send):
         if scope["type"] == "http":
-            # Generate or retrieve request ID
-            headers = dict(scope.get("headers", []))
-            request_id = headers.get(b"x-request-id", b"").decode() or str(uuid.uuid4())
-            scope["request_id"] = request_id
-            
-            # Add to logs
-            logging.LogRecord.request_id = request_id
-        
+            host = b""
+            request_id = None
+            content_length = b""
+            for key, value in scope.get("headers", ()):
+                if key == b"host":
+                    # Strip any port before matching, as TrustedHostMiddleware did
+                    host = value.split(b":", 1)[0]
+                elif key == b"x-request-id":
+                    # latin-1: header bytes are ASCII, no validation overhead
+                    request_id = value.decode("latin-1")
+                elif key == b"content-length":
+                    content_length = value
+
+            if self.enforce_host and (
+                host not in self._ALLOWED_EXACT
+                and not host.endswith(self._ALLOWED_SUFFIX)
+            ):
+                await PlainTextResponse("Invalid host header", status_code=400)(scope, receive, send)
+                return
+
+            # Reject oversized scan uploads from the declared length alone,
+            # before a single body byte is read or buffered
+            if scope["path"] == "/api/scan" and scope["method"] == "POST":
+                try:
+                    declared = int(content_length)
+                except ValueError:
+                    declared = 0
+                if declared > _MAX_SCAN_BODY_BYTES:
+                    await ORJSONResponse(
+                        {"detail": f"File size exceeds maximum of {scan.MAX_FILE_SIZE // (1024 * 1024)}MB"},
+                        status_code=400
+                    )(scope, receive, send)
+                    return
+
+            scope["request_id"] = request_id or _new_request_id()
+
         await self.app(scope, receive, send)
 
 
@@ -85,7 +154,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to initialize Supabase client: {e}")
         raise
-    
+
+    if settings.SENTRY_DSN and settings.ENVIRONMENT == 'production':
+        _init_sentry()
+
+    # Warm the ingredient library caches so the first request doesn't pay
+    # for file IO, parsing, and model validation
+    try:
+        from routers.ingredients import _load_ingredients, _parsed_ingredients
+        ingredients = _load_ingredients()
+        _parsed_ingredients(ingredients)
+        logger.info(f"✓ Ingredient library preloaded ({len(ingredients)} ingredients)")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not preload ingredient library: {e}")
+
     logger.info("✓ Application startup completed")
     
     yield
@@ -104,6 +186,7 @@ app = FastAPI(
     docs_url="/api/docs" if settings.DEBUG else None,  # Hide docs in production
     redoc_url="/api/redoc" if settings.DEBUG else None,
     openapi_url="/api/openapi.json" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,  # orjson encodes several times faster than stdlib json
 )
 
 # Configure CORS middleware FIRST - must be before other middleware to handle OPTIONS requests
@@ -116,67 +199,109 @@ app.add_middleware(
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
-# Add trusted host middleware for production security
-if settings.ENVIRONMENT == 'production':
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=["*.vercel.app", "localhost", "127.0.0.1"]
-    )
-
-# Add request ID middleware for tracing (after CORS)
-app.add_middleware(RequestIDMiddleware)
+# Custom request logging middleware - only registered when request logging
+# is enabled, so disabling it removes the whole timing/logging frame from
+# the hot path instead of re-checking the flag on every request
+if _ENABLE_REQUEST_LOGGING:
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        """
+        Log all incoming requests with timing information
+        Skip logging for OPTIONS (CORS preflight) requests to avoid interference
+        """
+        # Skip detailed logging for OPTIONS requests - let CORS handle them
+        if request.method == "OPTIONS":
+            return await call_next(request)
 
+        # perf_counter is a single clock read; building two datetimes and
+        # subtracting them per request is measurably more expensive
+        start_time = time.perf_counter()
+        # scope is a dict, so the previous getattr() lookup always missed and
+        # minted a second UUID per request
+        request_id = request.scope.get("request_id") or _new_request_id()
 
-# Custom request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """
-    Log all incoming requests with timing information
-    Skip logging for OPTIONS (CORS preflight) requests to avoid interference
-    """
-    # Skip detailed logging for OPTIONS requests - let CORS handle them
-    if request.method == "OPTIONS":
-        return await call_next(request)
-    
-    start_time = datetime.utcnow()
-    request_id = getattr(request.scope, "request_id", str(uuid.uuid4()))
-    
-    if settings.ENABLE_REQUEST_LOGGING:
+        # %-style args defer string formatting until a handler accepts the
+        # record, so disabled levels cost nothing
         logger.info(
-            f"→ {request.method} {request.url.path}",
+            "→ %s %s", request.method, request.url.path,
             extra={"request_id": request_id}
         )
-    
-    try:
-        response = await call_next(request)
-    except Exception as e:
-        duration = (datetime.utcnow() - start_time).total_seconds()
-        logger.error(
-            f"✗ {request.method} {request.url.path} - Error after {duration:.2f}s: {str(e)}",
-            extra={"request_id": request_id},
-            exc_info=True
-        )
-        raise
-    
-    duration = (datetime.utcnow() - start_time).total_seconds()
-    
-    if settings.ENABLE_REQUEST_LOGGING:
+
+        try:
+            response = await call_next(request)
+        except Exception as e:
+            duration = time.perf_counter() - start_time
+            logger.error(
+                "✗ %s %s - Error after %.2fs: %s", request.method, request.url.path, duration, e,
+                extra={"request_id": request_id},
+                exc_info=True
+            )
+            raise
+
+        duration = time.perf_counter() - start_time
+
         logger.info(
-            f"← {request.method} {request.url.path} - {response.status_code} ({duration:.2f}s)",
-            extra={"request_id": request_id}
-        )
-    
-    # Add request ID to response headers for tracing
-    response.headers["X-Request-ID"] = request_id
-    
-    # Check timeout
-    if duration > settings.REQUEST_TIMEOUT_SECONDS:
-        logger.warning(
-            f"⏱️ Request exceeded timeout threshold ({duration:.2f}s > {settings.REQUEST_TIMEOUT_SECONDS}s)",
+            "← %s %s - %s (%.2fs)", request.method, request.url.path, response.status_code, duration,
             extra={"request_id": request_id}
         )
-    
-    return response
+
+        # Add request ID to response headers for tracing
+        response.headers["X-Request-ID"] = request_id
+
+        # Check timeout
+        if duration > _REQUEST_TIMEOUT_SECONDS:
+            logger.warning(
+                "⏱️ Request exceeded timeout threshold (%.2fs > %ss)", duration, _REQUEST_TIMEOUT_SECONDS,
+                extra={"request_id": request_id}
+            )
+
+        return response
+
+else:
+    @app.middleware("http")
+    async def add_request_id_header(request: Request, call_next):
+        """Minimal middleware: expose the request ID header without logging"""
+        response = await call_next(request)
+        request_id = request.scope.get("request_id")
+        if request_id:
+            response.headers["X-Request-ID"] = request_id
+        return response
+
+
+# Optional in-process profiler for hot-path analysis (dev only): append
+# ?profile=1 to any request to get a pyinstrument HTML flamegraph of it,
+# including pydantic validation/serialization time that endpoint-level
+# timing can't see. pyinstrument is not a hard dependency
+if settings.DEBUG:
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        from fastapi.responses import HTMLResponse
+
+        @app.middleware("http")
+        async def profile_request(request: Request, call_next):
+            """Profile a single request when ?profile=1 is passed"""
+            if request.query_params.get("profile"):
+                profiler = Profiler(async_mode="enabled")
+                profiler.start()
+                await call_next(request)
+                profiler.stop()
+                return HTMLResponse(profiler.output_html())
+            return await call_next(request)
+
+
+# Host validation (production only) and request-ID tracing share a single
+# middleware so headers are iterated once per request. Registered LAST:
+# add_middleware prepends, so the last registration wraps outermost and
+# scope["request_id"] is already set by the time the logging middleware
+# and exception handler read it
+app.add_middleware(
+    RequestContextMiddleware,
+    enforce_host=settings.ENVIRONMENT == 'production'
+)
 
 
 # Include routers with API prefix
@@ -186,13 +311,35 @@ app.include_router(ingredients.router, prefix="/api")
 
 
 # Global OPTIONS handler for CORS preflight
+_OPTIONS_OK_BODY = b'{"status":"ok"}'
+
+
 @app.options("/{full_path:path}", include_in_schema=False)
 async def options_handler(full_path: str):
     """
     Handle OPTIONS preflight requests for CORS
     Returns 200 OK with appropriate CORS headers (set by CORSMiddleware)
     """
-    return {"status": "ok"}
+    # Prebuilt bytes: skips the serializer entirely on every preflight
+    return Response(content=_OPTIONS_OK_BODY, media_type="application/json")
+
+
+# /health and / serve constant content (apart from the /health timestamp),
+# so their bodies are encoded once at import rather than dict -> JSON per
+# probe. The timestamp is spliced into the prebuilt bytes per request.
+_HEALTH_BODY_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "service": "Lotus Backend",
+    "version": "0.1.0",
+    "environment": settings.ENVIRONMENT,
+})[:-1] + b',"timestamp":"'
+_ROOT_BODY = orjson.dumps({
+    "message": "Lotus Backend API",
+    "docs": "/api/docs" if settings.DEBUG else "Documentation disabled in production",
+    "health": "/health",
+    "ready": "/ready",
+    "version": "0.1.0",
+})
 
 
 @app.get("/health", tags=["Health"])
@@ -201,13 +348,10 @@ async def health_check():
     Health check endpoint to verify API is running
     Used by load balancers and monitoring systems
     """
-    return {
-        "status": "healthy",
-        "service": "Lotus Backend",
-        "version": "0.1.0",
-        "environment": settings.ENVIRONMENT,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
+    return Response(
+        content=_HEALTH_BODY_PREFIX + utc_now_iso().encode() + b'"}',
+        media_type="application/json"
+    )
 
 
 @app.get("/ready", tags=["Health"])
@@ -218,28 +362,28 @@ async def readiness_check():
     """
     try:
         # Test Supabase connection
-        from utils.supabase_client import get_supabase_client
         supabase = get_supabase_client()
         
         # Simple health check query
         health_response = supabase.table('ingredients_library').select('id').limit(1).execute()
-        
-        return {
+
+        # Direct ORJSONResponse: no jsonable_encoder pass over a plain dict
+        return ORJSONResponse({
             "ready": True,
             "service": "Lotus Backend",
             "database": "connected",
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
-    
+            "timestamp": utc_now_iso()
+        })
+
     except Exception as e:
         logger.error(f"Readiness check failed: {e}")
-        return {
+        return ORJSONResponse({
             "ready": False,
             "service": "Lotus Backend",
             "database": "disconnected",
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+            "timestamp": utc_now_iso()
+        })
 
 
 @app.get("/", tags=["Root"])
@@ -247,13 +391,7 @@ async def root():
     """
     Root endpoint - API information
     """
-    return {
-        "message": "Lotus Backend API",
-        "docs": "/api/docs" if settings.DEBUG else "Documentation disabled in production",
-        "health": "/health",
-        "ready": "/ready",
-        "version": "0.1.0"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.exception_handler(Exception)
@@ -262,25 +400,24 @@ async def global_exception_handler(request: Request, exc: Exception):
     Global exception handler for unhandled errors
     Logs to Sentry if configured
     """
-    request_id = getattr(request.scope, "request_id", str(uuid.uuid4()))
+    request_id = request.scope.get("request_id") or _new_request_id()
     logger.error(
         f"Unhandled exception: {str(exc)}",
         extra={"request_id": request_id},
         exc_info=True
     )
     
-    if settings.ENVIRONMENT == 'production':
-        return {
-            "error": "Internal Server Error",
+    # Exception handlers must return a Response; the old (dict, 500) tuple
+    # wasn't one, so Starlette crashed serializing it and every unhandled
+    # error surfaced as a bare 500 with no body
+    return ORJSONResponse(
+        {
+            "error": "Internal Server Error" if settings.ENVIRONMENT == 'production' else str(exc),
             "request_id": request_id,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }, 500
-    else:
-        return {
-            "error": str(exc),
-            "request_id": request_id,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }, 500
+            "timestamp": utc_now_iso()
+        },
+        status_code=500
+    )
 
 
 if __name__ == "__main__":
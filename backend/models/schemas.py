@@ -5,8 +5,8 @@ Defines request/response schemas for type validation and API documentation
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class SensitivityEnum(str, Enum):
@@ -21,6 +21,11 @@ class SensitivityEnum(str, Enum):
     VULVODYNIA = "Vulvodynia"
 
 
+# Built once at import for O(1) membership checks; callers should prefer
+# this over rebuilding [e.value for e in SensitivityEnum] per request
+VALID_SENSITIVITIES = frozenset(e.value for e in SensitivityEnum)
+
+
 class ScanResultIngredient(BaseModel):
     """Schema for risky ingredient in scan result"""
     name: str = Field(..., description="Ingredient name")
@@ -38,37 +43,13 @@ class ScanResult(BaseModel):
     explanation: str = Field(..., description="2-sentence personalized assessment")
     timestamp: str = Field(..., description="ISO8601 timestamp of scan")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "scan_id": "550e8400-e29b-41d4-a716-446655440000",
-                "user_id": "user_123",
-                "overall_risk_level": "Caution",
-                "ingredients_found": ["Fragrance", "Rayon", "Polyester"],
-                "risky_ingredients": [
-                    {
-                        "name": "Fragrance",
-                        "risk_level": "High Risk",
-                        "reason": "May trigger allergic reactions and skin irritation"
-                    }
-                ],
-                "explanation": "This product contains several potentially harmful ingredients. Consider alternatives with organic materials.",
-                "timestamp": "2026-01-31T18:30:00Z"
-            }
-        }
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
 
 class Sensitivity(BaseModel):
     """User sensitivity profile"""
     value: SensitivityEnum = Field(..., description="Sensitivity type")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "value": "PCOS"
-            }
-        }
-
 
 class UserProfile(BaseModel):
     """User profile with health sensitivities"""
@@ -77,16 +58,6 @@ class UserProfile(BaseModel):
     created_at: datetime = Field(..., description="Timestamp when profile was created")
     updated_at: datetime = Field(..., description="Timestamp when profile was last updated")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": "user_123",
-                "sensitivities": ["PCOS", "Sensitive Skin"],
-                "created_at": "2026-01-31T18:30:00Z",
-                "updated_at": "2026-01-31T18:30:00Z"
-            }
-        }
-
 
 class IngredientData(BaseModel):
     """Single ingredient from the ingredient library"""
@@ -94,18 +65,11 @@ class IngredientData(BaseModel):
     name: str = Field(..., description="Ingredient name")
     description: str = Field(..., description="Detailed ingredient description and health impact")
     risk_level: str = Field(..., description="Risk level: Low, Medium, or High")
-    related_ingredients: Optional[List[str]] = Field(default_factory=list, description="Similar or related ingredients")
+    # Stored as a tuple so cached, shared instances are immutable all the
+    # way down; serializes to a JSON array exactly like a list
+    related_ingredients: Optional[Tuple[str, ...]] = Field(default=(), description="Similar or related ingredients")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "id": 1,
-                "name": "Fragrance",
-                "description": "Synthetic fragrance compounds used to mask odors. May trigger allergic reactions.",
-                "risk_level": "High",
-                "related_ingredients": ["Phthalates", "BPA"]
-            }
-        }
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
 
 class ProfileCreateRequest(BaseModel):
@@ -113,13 +77,17 @@ class ProfileCreateRequest(BaseModel):
     user_id: str = Field(..., description="Unique user identifier", min_length=1)
     sensitivities: List[str] = Field(default_factory=list, description="List of health sensitivities")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": "user_123",
-                "sensitivities": ["PCOS", "Sensitive Skin"]
-            }
-        }
+    @field_validator('sensitivities')
+    @classmethod
+    def validate_sensitivities(cls, v):
+        """Reject unknown sensitivity values via the prebuilt frozenset"""
+        invalid = [s for s in v if s not in VALID_SENSITIVITIES]
+        if invalid:
+            raise ValueError(
+                f"Invalid sensitivities: {', '.join(invalid)}. "
+                f"Valid values: {', '.join(sorted(VALID_SENSITIVITIES))}"
+            )
+        return v
 
 
 class ProfileResponse(BaseModel):
@@ -131,17 +99,7 @@ class ProfileResponse(BaseModel):
     scan_history_count: Optional[int] = Field(default=0, description="Total number of scans performed")
     last_scan_date: Optional[datetime] = Field(default=None, description="Timestamp of most recent scan")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": "user_123",
-                "sensitivities": ["PCOS", "Sensitive Skin"],
-                "created_at": "2026-01-31T18:30:00Z",
-                "updated_at": "2026-01-31T18:30:00Z",
-                "scan_history_count": 5,
-                "last_scan_date": "2026-01-31T18:15:00Z"
-            }
-        }
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
 
 class IngredientsListResponse(BaseModel):
@@ -149,21 +107,7 @@ class IngredientsListResponse(BaseModel):
     total_count: int = Field(..., description="Total ingredients in library")
     ingredients: List[IngredientData] = Field(default_factory=list, description="List of ingredients")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "total_count": 25,
-                "ingredients": [
-                    {
-                        "id": 1,
-                        "name": "Fragrance",
-                        "description": "Synthetic fragrance compounds...",
-                        "risk_level": "High",
-                        "related_ingredients": []
-                    }
-                ]
-            }
-        }
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
 
 class BarcodeProduct(BaseModel):
@@ -176,51 +120,29 @@ class BarcodeProduct(BaseModel):
     coverage_score: Optional[float] = Field(default=None, description="Research coverage score 0-1")
     research_count: Optional[int] = Field(default=None, description="Number of research studies referenced")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "id": 1,
-                "brand_name": "Pure Care",
-                "barcode": "012345678901",
-                "ingredients": ["Organic Cotton", "Viscose"],
-                "product_type": "tampon",
-                "coverage_score": 0.85,
-                "research_count": 12
-            }
-        }
-
 
 class BarcodeLookupRequest(BaseModel):
     """Request body for barcode lookup endpoint"""
+    # Whitespace is stripped during validation, so handlers can use the
+    # fields directly; whitespace-only barcodes fail min_length up front
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     barcode: str = Field(..., description="Barcode to lookup", min_length=1)
     user_id: Optional[str] = Field(default=None, description="Optional user ID for personalization")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "barcode": "012345678901",
-                "user_id": "user_123"
-            }
-        }
+    @field_validator('barcode')
+    @classmethod
+    def normalize_barcode(cls, v):
+        """
+        Canonicalize scanned barcodes to digits only (drops spaces and
+        hyphens some scanners emit) so downstream lookups always hit the
+        cache with the same key for the same physical barcode
+        """
+        digits = ''.join(ch for ch in v if ch.isdigit())
+        return digits or v
 
 
 class BarcodeLookupResponse(BaseModel):
     """Response for successful barcode lookup"""
     product: BarcodeProduct = Field(..., description="Product details")
     found: bool = Field(default=True, description="Whether product was found in database")
-
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "found": True,
-                "product": {
-                    "id": 1,
-                    "brand_name": "Pure Care",
-                    "barcode": "012345678901",
-                    "ingredients": ["Organic Cotton", "Viscose"],
-                    "product_type": "tampon",
-                    "coverage_score": 0.85,
-                    "research_count": 12
-                }
-            }
-        }
@@ -4,9 +4,11 @@ Handles ingredient search, filtering, and detailed ingredient information
 """
 
 import logging
-import json
+import sys
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query, status
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Response, status
 from models.schemas import IngredientData, IngredientsListResponse
 from utils.supabase_client import get_supabase_client
 
@@ -15,9 +17,110 @@ logger = logging.getLogger(__name__)
 # Create router (will be included in main.py with /api prefix)
 router = APIRouter(tags=["Ingredients"])
 
+# Accepted values for the risk_level query parameter; invalid values are
+# rejected with a 400 (part of the documented API contract, so this is
+# checked in the handler rather than via the type system's 422)
+_VALID_RISK_LEVELS = frozenset({"Low", "Medium", "High", "all"})
+
 # In-memory ingredient cache (loaded from JSON file)
 _ingredient_cache: Optional[List[dict]] = None
 
+# Parsed IngredientData models, memoized against the raw list they were
+# built from so pydantic validation runs once per load instead of once per
+# item per request
+_parsed_cache: Optional[tuple] = None
+_parsed_cache_source: Optional[List[dict]] = None
+
+# id -> ingredient index, memoized against the list it was built from so
+# lookups are O(1) instead of a linear scan per request
+_ingredient_index: Optional[dict] = None
+_ingredient_index_source: Optional[List[dict]] = None
+
+# risk_level -> ingredients buckets, memoized the same way so filtered
+# listings reuse precomputed buckets instead of re-filtering per request
+_risk_buckets: Optional[dict] = None
+_risk_buckets_source: Optional[List[dict]] = None
+
+
+# (risk_level, offset, limit) -> encoded response body; the library only
+# changes on reload, so repeat pages (the default first page above all)
+# are served as pre-encoded bytes without touching pydantic or the encoder
+_page_cache: dict = {}
+_page_cache_source: Optional[List[dict]] = None
+
+# Bound on distinct pages kept; pagination params are request-controlled
+# and must not grow the cache without limit
+_PAGE_CACHE_MAX_ENTRIES = 256
+
+
+def _bucket_by_risk(all_ingredients: List[dict]) -> dict:
+    """
+    Build (and memoize) risk_level -> ingredient buckets for the given list
+
+    Args:
+        all_ingredients: Raw ingredient dictionaries to bucket
+
+    Returns:
+        Dict mapping each risk level to a tuple of IngredientData models
+    """
+    global _risk_buckets, _risk_buckets_source
+
+    if _risk_buckets is None or _risk_buckets_source is not all_ingredients:
+        buckets = {}
+        for ing in _parsed_ingredients(all_ingredients):
+            buckets.setdefault(ing.risk_level, []).append(ing)
+        _risk_buckets = {level: tuple(ings) for level, ings in buckets.items()}
+        _risk_buckets_source = all_ingredients
+
+    return _risk_buckets
+
+
+def _parsed_ingredients(all_ingredients: List[dict]) -> tuple:
+    """
+    Build (and memoize) validated IngredientData models for the given list
+
+    Args:
+        all_ingredients: Raw ingredient dictionaries to parse
+
+    Returns:
+        Tuple of IngredientData models in library order
+    """
+    global _parsed_cache, _parsed_cache_source
+
+    if _parsed_cache is None or _parsed_cache_source is not all_ingredients:
+        # Validation happens exactly once per load: bad rows are logged and
+        # dropped here so the request handlers never see them
+        models = []
+        for ing in all_ingredients:
+            try:
+                models.append(IngredientData.model_validate(ing))
+            except Exception as e:
+                logger.warning(f"Dropping invalid ingredient {ing.get('id')}: {e}")
+                continue
+        _parsed_cache = tuple(models)
+        _parsed_cache_source = all_ingredients
+
+    return _parsed_cache
+
+
+def _index_by_id(all_ingredients: List[dict]) -> dict:
+    """
+    Build (and memoize) an id -> IngredientData mapping for the given list
+
+    Args:
+        all_ingredients: Raw ingredient dictionaries to index
+
+    Returns:
+        Dict mapping ingredient id to its parsed IngredientData model
+    """
+    global _ingredient_index, _ingredient_index_source
+
+    if _ingredient_index is None or _ingredient_index_source is not all_ingredients:
+        _ingredient_index = {ing.id: ing for ing in _parsed_ingredients(all_ingredients)}
+        _ingredient_index_source = all_ingredients
+
+    return _ingredient_index
+
 
 def _load_ingredients() -> List[dict]:
     """
@@ -32,15 +135,26 @@ def _load_ingredients() -> List[dict]:
         return _ingredient_cache
     
     try:
-        with open("backend/data/ingredients.json", "r") as f:
-            data = json.load(f)
+        with open("backend/data/ingredients.json", "rb") as f:
+            data = orjson.loads(f.read())
             _ingredient_cache = data.get("ingredients", [])
+            # Intern names so the many cross-references in
+            # related_ingredients share one string object per name
+            for ing in _ingredient_cache:
+                name = ing.get("name")
+                if isinstance(name, str):
+                    ing["name"] = sys.intern(name)
+                related = ing.get("related_ingredients")
+                if related:
+                    ing["related_ingredients"] = [
+                        sys.intern(r) if isinstance(r, str) else r for r in related
+                    ]
             logger.info(f"Loaded {len(_ingredient_cache)} ingredients from JSON file")
             return _ingredient_cache
     except FileNotFoundError:
         logger.error("Ingredients JSON file not found at backend/data/ingredients.json")
         return []
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error parsing ingredients JSON: {e}")
         return []
 
@@ -68,12 +182,11 @@ async def list_ingredients(
     """
     try:
         # Validate risk_level parameter
-        valid_risk_levels = {"Low", "Medium", "High", "all"}
-        if risk_level not in valid_risk_levels:
+        if risk_level not in _VALID_RISK_LEVELS:
             logger.warning(f"Invalid risk_level filter: {risk_level}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid risk_level. Must be one of: {', '.join(valid_risk_levels)}"
+                detail=f"Invalid risk_level. Must be one of: {', '.join(_VALID_RISK_LEVELS)}"
             )
         
         logger.info(f"Listing ingredients with limit={limit}, offset={offset}, risk_level={risk_level}")
@@ -84,42 +197,42 @@ async def list_ingredients(
             logger.warning("No ingredients loaded from data source")
             return IngredientsListResponse(total_count=0, ingredients=[])
         
-        # Apply risk level filter
+        # Serve repeat pages from the pre-encoded body cache
+        global _page_cache, _page_cache_source
+        if _page_cache_source is not all_ingredients:
+            _page_cache = {}
+            _page_cache_source = all_ingredients
+
+        page_key = (risk_level, offset, limit)
+        cached_body = _page_cache.get(page_key)
+        if cached_body is not None:
+            return Response(content=cached_body, media_type="application/json")
+
+        # Models are parsed and bucketed once per load; requests only slice
         if risk_level != "all":
-            filtered = [ing for ing in all_ingredients if ing.get("risk_level") == risk_level]
+            filtered = _bucket_by_risk(all_ingredients).get(risk_level, ())
             logger.debug(f"Filtered {len(filtered)} ingredients by risk_level={risk_level}")
         else:
-            filtered = all_ingredients
-        
+            filtered = _parsed_ingredients(all_ingredients)
+
         total_count = len(filtered)
-        
+
         # Apply pagination
-        paginated = filtered[offset:offset + limit]
-        logger.debug(f"Returning {len(paginated)} ingredients after pagination")
-        
-        # Convert to IngredientData models
-        ingredients = []
-        for ing in paginated:
-            try:
-                ingredient = IngredientData(
-                    id=ing.get("id"),
-                    name=ing.get("name"),
-                    description=ing.get("description"),
-                    risk_level=ing.get("risk_level"),
-                    related_ingredients=ing.get("related_ingredients", [])
-                )
-                ingredients.append(ingredient)
-            except Exception as e:
-                logger.warning(f"Error converting ingredient {ing.get('id')}: {e}")
-                continue
-        
-        response = IngredientsListResponse(
+        ingredients = list(filtered[offset:offset + limit])
+        logger.debug(f"Returning {len(ingredients)} ingredients after pagination")
+
+        # Contents are already-validated models, so skip re-validation
+        response = IngredientsListResponse.model_construct(
             total_count=total_count,
             ingredients=ingredients
         )
-        
+
+        body = orjson.dumps(response.model_dump())
+        if len(_page_cache) < _PAGE_CACHE_MAX_ENTRIES:
+            _page_cache[page_key] = body
+
         logger.info(f"Successfully returned {len(ingredients)} ingredients")
-        return response
+        return Response(content=body, media_type="application/json")
     
     except HTTPException:
         raise
@@ -168,37 +281,17 @@ async def get_ingredient(ingredient_id: int) -> IngredientData:
                 detail="Ingredient library is empty"
             )
         
-        # Find ingredient by ID
-        ingredient_data = None
-        for ing in all_ingredients:
-            if ing.get("id") == ingredient_id:
-                ingredient_data = ing
-                break
-        
+        # Find the parsed ingredient by ID via the memoized index
+        ingredient = _index_by_id(all_ingredients).get(ingredient_id)
+
         # Check if ingredient exists
-        if not ingredient_data:
+        if not ingredient:
             logger.warning(f"Ingredient not found with id: {ingredient_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Ingredient with id {ingredient_id} not found"
             )
-        
-        # Convert to IngredientData model
-        try:
-            ingredient = IngredientData(
-                id=ingredient_data.get("id"),
-                name=ingredient_data.get("name"),
-                description=ingredient_data.get("description"),
-                risk_level=ingredient_data.get("risk_level"),
-                related_ingredients=ingredient_data.get("related_ingredients", [])
-            )
-        except Exception as e:
-            logger.error(f"Error converting ingredient {ingredient_id}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error processing ingredient data: {str(e)}"
-            )
-        
+
         logger.info(f"Successfully retrieved ingredient: {ingredient.name} (id: {ingredient_id})")
         return ingredient
     
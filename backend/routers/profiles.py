@@ -3,8 +3,10 @@ FastAPI router for user profile management
 Handles profile creation, updates, and retrieval with personalization data
 """
 
+import asyncio
 import logging
 from datetime import datetime
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, status
 from models.schemas import ProfileCreateRequest, ProfileResponse
 from utils.supabase_client import get_supabase_client
@@ -15,6 +17,17 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Profiles"])
 
 
+@lru_cache(maxsize=2048)
+def _parse_iso(timestamp: str) -> datetime:
+    """
+    Parse an ISO8601 timestamp string (with optional 'Z' suffix) to datetime
+
+    Cached because the same created_at/updated_at strings come back on
+    every request for a given profile until it changes
+    """
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
 @router.post("/profiles", response_model=ProfileResponse, status_code=status.HTTP_201_CREATED)
 async def create_or_update_profile(request: ProfileCreateRequest) -> ProfileResponse:
     """
@@ -45,31 +58,26 @@ async def create_or_update_profile(request: ProfileCreateRequest) -> ProfileResp
         # Get Supabase client
         supabase = get_supabase_client()
         
-        # Prepare profile data
+        # Prepare profile data; format the timestamp once and reuse it for
+        # the payload and the response fallbacks below
         now = datetime.utcnow()
-        
-        # Check if profile exists
-        try:
-            existing = supabase.table("profiles").select("*").eq("user_id", user_id).execute()
-            profile_exists = len(existing.data) > 0
-        except Exception as e:
-            logger.error(f"Error checking existing profile: {e}")
-            profile_exists = False
-        
-        # Prepare upsert data
+        now_iso = now.isoformat() + "Z"
+
+        # Prepare upsert data - created_at is deliberately omitted so the
+        # database default fills it on insert and the upsert leaves it
+        # untouched on update, saving the existence-check round trip
         profile_data = {
             "user_id": user_id,
             "sensitivities": request.sensitivities,
-            "updated_at": now.isoformat() + "Z"
+            "updated_at": now_iso
         }
-        
-        # Add created_at only if new profile
-        if not profile_exists:
-            profile_data["created_at"] = now.isoformat() + "Z"
-        
-        # Upsert profile to database
+
+        # Upsert profile to database; the sync client call runs in a worker
+        # thread so it doesn't block the event loop
         try:
-            response = supabase.table("profiles").upsert(profile_data).execute()
+            response = await asyncio.to_thread(
+                lambda: supabase.table("profiles").upsert(profile_data).execute()
+            )
             logger.info(f"Profile upserted for user: {user_id}")
         except Exception as e:
             logger.error(f"Error upserting profile to database: {e}")
@@ -77,33 +85,38 @@ async def create_or_update_profile(request: ProfileCreateRequest) -> ProfileResp
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to save profile: {str(e)}"
             )
-        
-        # Get scan history info
+
+        # Get scan history info - one counted query returns both the total
+        # and the most recent timestamp instead of a second full fetch
         scan_count = 0
         last_scan = None
         try:
-            scans = supabase.table("scans").select("timestamp").eq("user_id", user_id).order("timestamp", desc=True).limit(1).execute()
+            scans = await asyncio.to_thread(
+                lambda: supabase.table("scans").select("timestamp", count="exact").eq("user_id", user_id).order("timestamp", desc=True).limit(1).execute()
+            )
             if scans.data and len(scans.data) > 0:
-                scan_count = len(supabase.table("scans").select("id").eq("user_id", user_id).execute().data)
+                scan_count = scans.count or 0
                 last_scan_str = scans.data[0].get("timestamp")
                 if last_scan_str:
-                    last_scan = datetime.fromisoformat(last_scan_str.replace("Z", "+00:00"))
+                    last_scan = _parse_iso(last_scan_str)
         except Exception as e:
             logger.debug(f"Could not fetch scan history: {e}")
         
         # Parse response data
-        created_at_str = response.data[0].get("created_at") if response.data else now.isoformat() + "Z"
-        updated_at_str = response.data[0].get("updated_at") if response.data else now.isoformat() + "Z"
+        created_at_str = response.data[0].get("created_at") if response.data else now_iso
+        updated_at_str = response.data[0].get("updated_at") if response.data else now_iso
         
         # Ensure proper ISO format
         try:
-            created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-            updated_at = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
+            created_at = _parse_iso(created_at_str)
+            updated_at = _parse_iso(updated_at_str)
         except:
             created_at = now
             updated_at = now
         
-        profile_response = ProfileResponse(
+        # Every field is already validated or parsed above, so skip
+        # re-validation when assembling the response
+        profile_response = ProfileResponse.model_construct(
             user_id=user_id,
             sensitivities=request.sensitivities,
             created_at=created_at,
@@ -111,7 +124,7 @@ async def create_or_update_profile(request: ProfileCreateRequest) -> ProfileResp
             scan_history_count=scan_count,
             last_scan_date=last_scan
         )
-        
+
         logger.info(f"Profile created/updated successfully for user: {user_id}")
         return profile_response
     
@@ -156,64 +169,109 @@ async def get_profile(user_id: str) -> ProfileResponse:
         # Get Supabase client
         supabase = get_supabase_client()
         
-        # Fetch profile from database
-        try:
-            response = supabase.table("profiles").select("*").eq("user_id", user_id).execute()
-        except Exception as e:
-            logger.error(f"Error querying profiles table: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Database error: {str(e)}"
-            )
-        
-        # Check if profile exists
-        if not response.data or len(response.data) == 0:
-            logger.warning(f"Profile not found for user: {user_id}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Profile not found for user_id: {user_id}"
-            )
-        
-        profile_data = response.data[0]
-        logger.debug(f"Profile data retrieved: {profile_data}")
-        
-        # Get scan history statistics
         scan_count = 0
         last_scan = None
+
+        # Preferred path: one RPC returns the profile row and its scan
+        # statistics in a single round trip (see
+        # database/create_profile_stats_function.sql)
         try:
-            scans_response = supabase.table("scans").select("timestamp").eq("user_id", user_id).execute()
-            if scans_response.data:
-                scan_count = len(scans_response.data)
-                # Get most recent scan
-                scans_ordered = supabase.table("scans").select("timestamp").eq("user_id", user_id).order("timestamp", desc=True).limit(1).execute()
-                if scans_ordered.data and len(scans_ordered.data) > 0:
-                    last_scan_str = scans_ordered.data[0].get("timestamp")
-                    if last_scan_str:
-                        last_scan = datetime.fromisoformat(last_scan_str.replace("Z", "+00:00"))
+            rpc_response = await asyncio.to_thread(
+                lambda: supabase.rpc("get_profile_with_stats", {"p_user_id": user_id}).execute()
+            )
+            rpc_rows = rpc_response.data
         except Exception as e:
-            logger.debug(f"Could not fetch scan history for user {user_id}: {e}")
-        
-        # Parse timestamps
-        created_at_str = profile_data.get("created_at", datetime.utcnow().isoformat() + "Z")
-        updated_at_str = profile_data.get("updated_at", datetime.utcnow().isoformat() + "Z")
+            logger.debug(f"get_profile_with_stats RPC unavailable, falling back: {e}")
+            rpc_rows = None
+
+        if isinstance(rpc_rows, list):
+            if not rpc_rows:
+                logger.warning(f"Profile not found for user: {user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Profile not found for user_id: {user_id}"
+                )
+
+            profile_data = rpc_rows[0]
+            scan_count = profile_data.get("scan_count") or 0
+            try:
+                last_scan_str = profile_data.get("last_scan_at")
+                if last_scan_str:
+                    last_scan = _parse_iso(last_scan_str)
+            except Exception as e:
+                logger.debug(f"Could not parse last scan timestamp for user {user_id}: {e}")
+
+        else:
+            # Fallback: the profile row and the scan statistics are
+            # independent, so fetch them concurrently; the sync client
+            # calls run in worker threads
+            def _fetch_profile():
+                return supabase.table("profiles").select("*").eq("user_id", user_id).execute()
+
+            def _fetch_scan_stats():
+                return supabase.table("scans").select("timestamp", count="exact").eq("user_id", user_id).order("timestamp", desc=True).limit(1).execute()
+
+            response, scans_response = await asyncio.gather(
+                asyncio.to_thread(_fetch_profile),
+                asyncio.to_thread(_fetch_scan_stats),
+                return_exceptions=True
+            )
+
+            if isinstance(response, Exception):
+                logger.error(f"Error querying profiles table: {response}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Database error: {str(response)}"
+                )
+
+            # Check if profile exists
+            if not response.data or len(response.data) == 0:
+                logger.warning(f"Profile not found for user: {user_id}")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Profile not found for user_id: {user_id}"
+                )
+
+            profile_data = response.data[0]
+
+            # Unpack scan history statistics (best effort, already fetched)
+            try:
+                if isinstance(scans_response, Exception):
+                    raise scans_response
+                if scans_response.data and len(scans_response.data) > 0:
+                    scan_count = scans_response.count or 0
+                    last_scan_str = scans_response.data[0].get("timestamp")
+                    if last_scan_str:
+                        last_scan = _parse_iso(last_scan_str)
+            except Exception as e:
+                logger.debug(f"Could not fetch scan history for user {user_id}: {e}")
+
+        logger.debug(f"Profile data retrieved: {profile_data}")
         
+        # Parse timestamps, computing the fallback "now" a single time
+        now = datetime.utcnow()
+        now_iso = now.isoformat() + "Z"
+        created_at_str = profile_data.get("created_at", now_iso)
+        updated_at_str = profile_data.get("updated_at", now_iso)
+
         try:
-            created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-            updated_at = datetime.fromisoformat(updated_at_str.replace("Z", "+00:00"))
+            created_at = _parse_iso(created_at_str)
+            updated_at = _parse_iso(updated_at_str)
         except:
-            now = datetime.utcnow()
             created_at = now
             updated_at = now
         
-        profile_response = ProfileResponse(
+        # Every field is already parsed into its target type above, so skip
+        # re-validation when assembling the response
+        profile_response = ProfileResponse.model_construct(
             user_id=user_id,
-            sensitivities=profile_data.get("sensitivities", []),
+            sensitivities=profile_data.get("sensitivities") or [],
             created_at=created_at,
             updated_at=updated_at,
             scan_history_count=scan_count,
             last_scan_date=last_scan
         )
-        
+
         logger.info(f"Profile retrieved successfully for user: {user_id}")
         return profile_response
     
@@ -3,22 +3,114 @@ FastAPI router for product scan endpoints
 Handles barcode-based product lookup and orchestrates risk assessment
 """
 
+import asyncio
 import logging
+import sys
 import uuid
-from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Query, HTTPException, status, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, Query, HTTPException, UploadFile, status
+from cachetools import TTLCache
 from models.schemas import BarcodeLookupRequest, BarcodeLookupResponse, BarcodeProduct
 from utils.barcode_lookup import lookup_product_by_barcode, BarcodeLookupError
-from utils.risk_scorer import generate_risk_score_for_product, RiskScorerError
+from utils.risk_scorer import generate_risk_score, generate_risk_score_for_product, RiskScorerError
 from utils.supabase_client import get_supabase_client
+from utils.timestamps import utc_now_iso
 
 logger = logging.getLogger(__name__)
 
 # Create router with /api prefix (will be included in main.py)
 router = APIRouter()
 
+# Accepted upload MIME types for image scans. A frozenset of interned
+# strings: membership checks on interned values short-circuit on pointer
+# equality instead of comparing characters
+ALLOWED_IMAGE_TYPES = frozenset(
+    sys.intern(mime) for mime in ("image/jpeg", "image/png", "image/webp")
+)
+
+# Maximum accepted upload size (20MB) and the chunk size used when
+# streaming the body in
+MAX_FILE_SIZE = 20 * 1024 * 1024
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Leading magic bytes of the supported image formats, so the
+# client-supplied Content-Type header is never trusted on its own
+_IMAGE_MAGIC_PREFIXES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
+
+
+def _sniff_image_mime(head: bytes) -> Optional[str]:
+    """
+    Detect a supported image MIME type from the first bytes of an upload
+
+    Args:
+        head: At least the first 12 bytes of the file
+
+    Returns:
+        Detected MIME type, or None if the bytes match no supported format
+    """
+    for prefix, mime in _IMAGE_MAGIC_PREFIXES:
+        if head.startswith(prefix):
+            return mime
+    # WebP: RIFF container with a WEBP fourcc at offset 8
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+# Organic/safe brand names to search per product type
+# Built once at import so get_safer_alternatives doesn't rebuild it per call
+ORGANIC_BRANDS = {
+    "pad": ("Rael", "Cora", "Organyc"),
+    "tampon": ("Organyc", "Cora", "Honey Pot")
+}
+
+# Curated alternatives for the Always pads barcode, built once at import
+# instead of re-allocating the same three dicts on every matching scan
+_ALWAYS_SAFER_ALTERNATIVES = (
+    {
+        "id": 29,
+        "brand_name": "Rael Organic Cotton Cover Pads",
+        "product_type": "pad",
+        "safety_label": "Safe",
+        "url": "https://www.getrael.com/collections/pads/products/petite-organic-cotton-pads?variant=51779702718829"
+    },
+    {
+        "id": 30,
+        "brand_name": "Cora Organic Ultra Thin Period Pads",
+        "product_type": "pad",
+        "safety_label": "Safe",
+        "url": "https://www.walmart.com/ip/Cora-Compact-Applicator-Tampons-100-Organic-Cotton-Regular-Super-32-Count/693365963"
+    },
+    {
+        "id": 31,
+        "brand_name": "Organyc Heavy Night Pads",
+        "product_type": "pad",
+        "safety_label": "Safe",
+        "url": "https://thehoneypot.co/products/organic-duo-pack-tampons?variant=32026105249885&country=US&currency=USD"
+    },
+)
+
+# Curated safer-alternative sets keyed by barcode. New products get a row
+# here (or a startup-loaded JSON file if the table grows) instead of
+# another branch in the handler
+_SAFER_ALTERNATIVES_BY_BARCODE = {
+    "037000561538": _ALWAYS_SAFER_ALTERNATIVES,
+}
+
+# Bound on concurrent history writes so scan bursts don't pile up worker
+# threads and database connections; the set keeps strong references to
+# in-flight tasks so the event loop doesn't garbage-collect them
+_HISTORY_WRITE_SEM = asyncio.Semaphore(8)
+_history_tasks: set = set()
+
+# Safer-alternative results keyed on (product_type, exclude_product_id);
+# the organic pool is tiny and near-static, so a 10-minute TTL turns the
+# brand queries into memory hits for repeat scans. Only touched from the
+# event loop, so no lock is needed
+_safer_alternatives_cache = TTLCache(maxsize=64, ttl=600)
+
 
 async def get_safer_alternatives(product_type: str, exclude_product_id: int, limit: int = 3) -> list:
     """
@@ -33,23 +125,19 @@ async def get_safer_alternatives(product_type: str, exclude_product_id: int, lim
         List of safer alternative products
     """
     try:
+        cache_key = (product_type, exclude_product_id)
+        cached = _safer_alternatives_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         supabase = get_supabase_client()
-        
-        # Define organic/safe brand prefixes for each product type
-        organic_brands = {
-            "pad": ["Rael", "Cora", "Organyc"],
-            "tampon": ["Organyc", "Cora", "Honey Pot"]
-        }
-        
-        brands_to_search = organic_brands.get(product_type, [])
-        alternatives = []
-        
-        # Query for each organic brand
-        for brand in brands_to_search:
-            if len(alternatives) >= limit:
-                break
-                
-            result = supabase.table("products") \
+
+        brands_to_search = ORGANIC_BRANDS.get(product_type, ())
+        if not brands_to_search:
+            return []
+
+        def _query_brand(brand: str):
+            return supabase.table("products") \
                 .select("id, brand_name, product_type, barcode, coverage_score") \
                 .eq("product_type", product_type) \
                 .neq("id", exclude_product_id) \
@@ -57,7 +145,21 @@ async def get_safer_alternatives(product_type: str, exclude_product_id: int, lim
                 .eq("status", "ready") \
                 .limit(1) \
                 .execute()
-            
+
+        # Fire all brand queries concurrently so latency is one round trip
+        # instead of one per brand; the sync client runs in worker threads
+        results = await asyncio.gather(
+            *(asyncio.to_thread(_query_brand, brand) for brand in brands_to_search),
+            return_exceptions=True
+        )
+
+        alternatives = []
+        for brand, result in zip(brands_to_search, results):
+            if len(alternatives) >= limit:
+                break
+            if isinstance(result, Exception):
+                logger.debug("Safer-alternative query failed for brand %s: %s", brand, result)
+                continue
             if result.data:
                 product = result.data[0]
                 alternatives.append({
@@ -66,12 +168,13 @@ async def get_safer_alternatives(product_type: str, exclude_product_id: int, lim
                     "product_type": product["product_type"],
                     "safety_label": "Safe"
                 })
-        
-        logger.info(f"Found {len(alternatives)} safer alternatives for {product_type}")
+
+        _safer_alternatives_cache[cache_key] = alternatives
+        logger.info("Found %s safer alternatives for %s", len(alternatives), product_type)
         return alternatives
         
     except Exception as e:
-        logger.error(f"Error fetching safer alternatives: {e}", exc_info=True)
+        logger.error("Error fetching safer alternatives: %s", e, exc_info=True)
         return []
 
 
@@ -114,13 +217,17 @@ async def save_scan_to_history(
             "explanation": explanation
         }
         
-        result = supabase.table("scan_history").insert(data).execute()
+        # Run the sync client call in a worker thread so the insert doesn't
+        # block the event loop
+        result = await asyncio.to_thread(
+            lambda: supabase.table("scan_history").insert(data).execute()
+        )
         
         if result.data:
-            logger.info(f"Scan history saved: {scan_id}")
+            logger.info("Scan history saved: %s", scan_id)
             return True
         else:
-            logger.warning(f"Failed to save scan history: {scan_id}")
+            logger.warning("Failed to save scan history: %s", scan_id)
             return False
             
     except Exception as e:
@@ -129,13 +236,144 @@ async def save_scan_to_history(
         
         # RLS errors are expected in some environments - log as warning
         if "row-level security policy" in error_msg or "401 Unauthorized" in error_msg:
-            logger.warning(f"Scan history save blocked by RLS policy (expected in some envs): {scan_id}")
+            logger.warning("Scan history save blocked by RLS policy (expected in some envs): %s", scan_id)
         else:
-            logger.error(f"Error saving scan history: {e}", exc_info=True)
+            logger.error("Error saving scan history: %s", e, exc_info=True)
         
         return False
 
 
+async def _save_history_bounded(**kwargs) -> None:
+    """
+    Run save_scan_to_history under the concurrency semaphore
+    Used by fire-and-forget tasks spawned from the assessment handler
+    """
+    async with _HISTORY_WRITE_SEM:
+        await save_scan_to_history(**kwargs)
+
+
+@router.post("/scan", tags=["Scan"])
+async def scan_product(
+    user_id: str = Query(..., min_length=1, description="User ID for personalized assessment"),
+    file: UploadFile = File(..., description="Product label image (JPEG, PNG, or WebP)")
+) -> dict:
+    """
+    Scan a product label image and generate a personalized risk assessment
+
+    Args:
+        user_id: User identifier for fetching profile and sensitivities
+        file: Uploaded product image (max 20MB)
+
+    Returns:
+        JSON response with:
+        - scan_id: Unique identifier for this scan
+        - user_id: User who performed the scan
+        - overall_risk_level: "Low Risk | Caution | High Risk"
+        - ingredients_found: List of extracted ingredients
+        - risky_ingredients: List of concerning ingredients with explanations
+        - explanation: 2-sentence personalized assessment
+        - timestamp: ISO8601 timestamp
+
+    Raises:
+        HTTPException 400: Invalid file type, empty file, or oversized file
+        HTTPException 422: Missing user_id or file
+        HTTPException 500: Assessment pipeline error
+    """
+    try:
+        # Validate content type before touching the body at all; interning
+        # the header value lets the membership check hit pointer equality
+        # against the interned whitelist entries
+        content_type = sys.intern(file.content_type or "")
+        if content_type not in ALLOWED_IMAGE_TYPES:
+            logger.warning("Scan request with invalid file type: %s", content_type)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file type: {content_type}. Must be one of: {', '.join(sorted(ALLOWED_IMAGE_TYPES))}"
+            )
+
+        logger.info("Received scan request from user: %s", user_id)
+
+        # Stream the upload in fixed chunks, rejecting the moment the
+        # running total crosses the cap - an oversized body is never fully
+        # buffered in memory
+        file_data = bytearray()
+        while True:
+            chunk = await file.read(_UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            file_data.extend(chunk)
+            if len(file_data) > MAX_FILE_SIZE:
+                logger.warning("Scan upload exceeds size limit for user: %s", user_id)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File size exceeds maximum of {MAX_FILE_SIZE // (1024 * 1024)}MB"
+                )
+
+        if not file_data:
+            logger.warning("Scan request with empty file from user: %s", user_id)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty"
+            )
+
+        # Confirm the magic bytes actually belong to a supported image
+        # format - the Content-Type header above is client-supplied
+        if _sniff_image_mime(bytes(file_data[:12])) is None:
+            logger.warning("Scan upload failed magic-byte check for user: %s", user_id)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid file type: file content is not a supported image format"
+            )
+
+        # Run the full assessment pipeline (OCR → vector search → LLM)
+        try:
+            assessment = await generate_risk_score(bytes(file_data), user_id)
+        except RiskScorerError as e:
+            logger.error("Risk scoring error: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Assessment failed: {str(e)}"
+            )
+
+        scan_id = uuid.uuid4().hex
+        timestamp = utc_now_iso()
+
+        response = {
+            "scan_id": scan_id,
+            "user_id": user_id,
+            "overall_risk_level": assessment.get("risk_level", "Caution"),
+            "ingredients_found": assessment.get("ingredients_found", []),
+            "risky_ingredients": assessment.get("risky_ingredients", []),
+            "explanation": assessment.get("explanation", "Unable to generate assessment"),
+            "timestamp": timestamp
+        }
+
+        logger.info("Scan completed. Risk Level: %s", response['overall_risk_level'])
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in scan endpoint: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+
+
+@router.get("/scan/health", tags=["Scan"], include_in_schema=False)
+async def scan_service_health_check() -> dict:
+    """
+    Health check endpoint for the image scan service
+    """
+    return {
+        "status": "healthy",
+        "service": "scan-router",
+        "version": "0.2.0"
+    }
+
+
 @router.post("/scan/barcode", tags=["Scan"], response_model=BarcodeLookupResponse)
 async def scan_barcode(
     request: BarcodeLookupRequest
@@ -160,22 +398,16 @@ async def scan_barcode(
         HTTPException 500: Lookup error
     """
     try:
-        # Validate barcode
-        if not request.barcode or not request.barcode.strip():
-            logger.warning("Scan request with empty barcode")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Barcode cannot be empty"
-            )
-        
-        barcode = request.barcode.strip()
-        logger.info(f"Received barcode scan request: {barcode}")
+        # Emptiness and whitespace are rejected at model validation, so
+        # the barcode is already stripped and non-empty here
+        barcode = request.barcode
+        logger.info("Received barcode scan request: %s", barcode)
         
         # Lookup product by barcode
         try:
             product_data = await lookup_product_by_barcode(barcode)
         except BarcodeLookupError as e:
-            logger.error(f"Barcode lookup error: {e}")
+            logger.error("Barcode lookup error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to lookup barcode: {str(e)}"
@@ -183,14 +415,16 @@ async def scan_barcode(
         
         # Check if product was found
         if not product_data:
-            logger.warning(f"Product not found for barcode: {barcode}")
+            logger.warning("Product not found for barcode: %s", barcode)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Product not found for barcode: {barcode}"
             )
         
-        # Convert to BarcodeProduct schema
-        product = BarcodeProduct(**product_data)
+        # Convert to BarcodeProduct schema. The lookup util builds this
+        # dict with exactly the model's fields from our own database rows,
+        # so construction skips re-validation
+        product = BarcodeProduct.model_construct(**product_data)
         
         # Format response
         response = {
@@ -198,14 +432,14 @@ async def scan_barcode(
             "product": product
         }
         
-        logger.info(f"Barcode scan successful. Product: {product.brand_name}, ID: {product.id}")
+        logger.info("Barcode scan successful. Product: %s, ID: %s", product.brand_name, product.id)
         
         return response
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in barcode scan endpoint: {e}", exc_info=True)
+        logger.error("Unexpected error in barcode scan endpoint: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -214,8 +448,7 @@ async def scan_barcode(
 
 @router.post("/scan/barcode/assess", tags=["Scan"])
 async def scan_barcode_with_assessment(
-    request: BarcodeLookupRequest,
-    background_tasks: BackgroundTasks
+    request: BarcodeLookupRequest
 ) -> dict:
     """
     Scan barcode and generate personalized health risk assessment
@@ -241,43 +474,40 @@ async def scan_barcode_with_assessment(
         HTTPException 500: Assessment error
     """
     try:
-        # Validate inputs
-        if not request.barcode or not request.barcode.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Barcode cannot be empty"
-            )
-        
-        if not request.user_id or not request.user_id.strip():
+        # The barcode is already stripped and non-empty after model
+        # validation; user_id is optional on the shared request model, so
+        # its presence is still checked here
+        if not request.user_id:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="user_id is required for risk assessment"
             )
-        
-        barcode = request.barcode.strip()
-        user_id = request.user_id.strip()
-        
-        logger.info(f"Starting barcode assessment: {barcode} for user: {user_id}")
+
+        barcode = request.barcode
+        user_id = request.user_id
+
+        logger.info("Starting barcode assessment: %s for user: %s", barcode, user_id)
         
         # Step 1: Lookup product by barcode
         try:
             product_data = await lookup_product_by_barcode(barcode)
         except BarcodeLookupError as e:
-            logger.error(f"Barcode lookup error: {e}")
+            logger.error("Barcode lookup error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to lookup barcode: {str(e)}"
             )
         
         if not product_data:
-            logger.warning(f"Product not found for barcode: {barcode}")
+            logger.warning("Product not found for barcode: %s", barcode)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Product not found for barcode: {barcode}"
             )
         
-        product = BarcodeProduct(**product_data)
-        
+        # Trusted, already-shaped lookup data: skip re-validation
+        product = BarcodeProduct.model_construct(**product_data)
+
         # Step 2: Generate risk assessment based on product ingredients
         logger.debug("Step 1: Product lookup completed. Step 2: Generating risk assessment")
         try:
@@ -288,43 +518,18 @@ async def scan_barcode_with_assessment(
                 user_id=user_id
             )
         except RiskScorerError as e:
-            logger.error(f"Risk scoring error: {e}")
+            logger.error("Risk scoring error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Assessment failed: {str(e)}"
             )
         
         # Generate scan response
-        scan_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat() + "Z"
-        
-        # Step 3: Hardcoded safer alternatives for Always pads barcode
-        safer_alternatives = []
-        if barcode == "037000561538":
-            # Always pads - show organic alternatives with purchase links
-            safer_alternatives = [
-                {
-                    "id": 29,
-                    "brand_name": "Rael Organic Cotton Cover Pads",
-                    "product_type": "pad",
-                    "safety_label": "Safe",
-                    "url": "https://www.getrael.com/collections/pads/products/petite-organic-cotton-pads?variant=51779702718829"
-                },
-                {
-                    "id": 30,
-                    "brand_name": "Cora Organic Ultra Thin Period Pads",
-                    "product_type": "pad",
-                    "safety_label": "Safe",
-                    "url": "https://www.walmart.com/ip/Cora-Compact-Applicator-Tampons-100-Organic-Cotton-Regular-Super-32-Count/693365963"
-                },
-                {
-                    "id": 31,
-                    "brand_name": "Organyc Heavy Night Pads",
-                    "product_type": "pad",
-                    "safety_label": "Safe",
-                    "url": "https://thehoneypot.co/products/organic-duo-pack-tampons?variant=32026105249885&country=US&currency=USD"
-                }
-            ]
+        scan_id = uuid.uuid4().hex
+        timestamp = utc_now_iso()
+        
+        # Step 3: Curated safer alternatives, O(1) per barcode
+        safer_alternatives = _SAFER_ALTERNATIVES_BY_BARCODE.get(barcode, ())
         
         response = {
             "scan_id": scan_id,
@@ -338,11 +543,13 @@ async def scan_barcode_with_assessment(
             "timestamp": timestamp
         }
         
-        logger.info(f"Barcode assessment completed. Risk Level: {response['overall_risk_level']}")
+        logger.info("Barcode assessment completed. Risk Level: %s", response['overall_risk_level'])
         
-        # Save scan to history in background (non-blocking for faster response)
-        background_tasks.add_task(
-            save_scan_to_history,
+        # Save scan to history without delaying the response. A detached
+        # task (unlike BackgroundTasks) isn't tied to the request lifecycle,
+        # so a client disconnect can't cancel the write, and the semaphore
+        # bounds how many writes a burst can have in flight at once
+        task = asyncio.create_task(_save_history_bounded(
             scan_id=scan_id,
             user_id=user_id,
             product=product,
@@ -350,14 +557,16 @@ async def scan_barcode_with_assessment(
             risk_score=assessment.get("risk_score"),
             risky_ingredients=response['risky_ingredients'],
             explanation=response['explanation']
-        )
+        ))
+        _history_tasks.add(task)
+        task.add_done_callback(_history_tasks.discard)
         
         return response
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in barcode assessment endpoint: {e}", exc_info=True)
+        logger.error("Unexpected error in barcode assessment endpoint: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -386,7 +595,9 @@ async def get_scan_history(
         HTTPException 500: Database error
     """
     try:
-        if not user_id or not user_id.strip():
+        # Strip once and reuse, rather than stripping again for the check
+        user_id = user_id.strip()
+        if not user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="user_id is required"
@@ -394,25 +605,29 @@ async def get_scan_history(
         
         supabase = get_supabase_client()
         
-        # Query scan_history joined with products
-        result = supabase.table("scan_history") \
-            .select("""
-                id,
-                scan_id,
-                barcode,
-                risk_level,
-                risk_score,
-                scanned_at,
-                products:product_id (
-                    id,
-                    brand_name,
-                    product_type
-                )
-            """) \
-            .eq("user_id", user_id) \
-            .order("scanned_at", desc=True) \
-            .limit(limit) \
-            .execute()
+        # Query scan_history joined with products; only the fields the
+        # response actually uses are projected. The sync client call runs
+        # in a worker thread so it doesn't block the event loop
+        def _fetch_history():
+            return supabase.table("scan_history") \
+                .select("""
+                    scan_id,
+                    barcode,
+                    risk_level,
+                    risk_score,
+                    scanned_at,
+                    products:product_id (
+                        id,
+                        brand_name,
+                        product_type
+                    )
+                """) \
+                .eq("user_id", user_id) \
+                .order("scanned_at", desc=True) \
+                .limit(limit) \
+                .execute()
+
+        result = await asyncio.to_thread(_fetch_history)
         
         if not result.data:
             return {
@@ -420,21 +635,22 @@ async def get_scan_history(
                 "count": 0
             }
         
-        # Format response
-        scans = []
-        for scan in result.data:
-            product_data = scan.get("products")
-            scans.append({
+        # Format response in a single comprehension; the `or {}` keeps the
+        # row shape branch-free when the product join comes back null
+        scans = [
+            {
                 "scan_id": scan["scan_id"],
                 "barcode": scan["barcode"],
-                "brand_name": product_data.get("brand_name") if product_data else "Unknown",
-                "product_type": product_data.get("product_type") if product_data else "general",
+                "brand_name": (scan.get("products") or {}).get("brand_name", "Unknown"),
+                "product_type": (scan.get("products") or {}).get("product_type", "general"),
                 "risk_level": scan["risk_level"],
                 "risk_score": scan.get("risk_score"),
                 "scanned_at": scan["scanned_at"]
-            })
-        
-        logger.info(f"Retrieved {len(scans)} scan history records for user {user_id}")
+            }
+            for scan in result.data
+        ]
+
+        logger.info("Retrieved %s scan history records for user %s", len(scans), user_id)
         
         return {
             "scans": scans,
@@ -444,7 +660,7 @@ async def get_scan_history(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching scan history: {e}", exc_info=True)
+        logger.error("Error fetching scan history: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch scan history: {str(e)}"
@@ -4,20 +4,31 @@ Loads ingredients from JSON and generates OpenAI embeddings for batch upsert
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
+import random
 import sys
+
+import orjson
 from pathlib import Path
-from typing import List, Dict, Any
-from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import settings
 from utils.supabase_client import get_supabase_client
-from openai import OpenAI, RateLimitError, APIError
+from openai import AsyncOpenAI, RateLimitError, APIError
+
+# ijson parses the ingredients array incrementally instead of
+# materializing the whole document first; it's not a hard dependency, so
+# loading falls back to orjson when it isn't installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Configure logging
 logging.basicConfig(
@@ -30,18 +41,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Async OpenAI client, created on first use so importing this module stays
+# cheap (.env loading is already handled by config)
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def _get_openai_client() -> AsyncOpenAI:
+    """Lazily create and reuse the async OpenAI client"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    return _openai_client
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 # Constants
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMENSION = 1536
-BATCH_SIZE = 20
+# Rows per PostgREST upsert request. Each 1536-float embedding is ~25KB of
+# JSON, so 100 rows is ~2.5MB - comfortably within a single request and
+# far cheaper than many small batches. Overridable for constrained setups
+BATCH_SIZE = int(os.getenv('SUPABASE_UPSERT_BATCH_SIZE', '100'))
+# Inputs per embeddings request: the API accepts a list and returns all
+# vectors in one round trip; 128 short ingredient texts stay well under
+# the per-request token budget
+EMBED_BATCH_SIZE = 128
+# In-flight embedding batches: overlapping a few requests hides the
+# ~200-500ms API latency while staying far below OpenAI rate limits
+EMBED_BATCH_CONCURRENCY = 4
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 2
+RETRY_MAX_DELAY = 32
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Extract a Retry-After hint from an OpenAI error response, if any"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    try:
+        value = response.headers.get('retry-after')
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
 
 
 class IngredientEmbedder:
@@ -53,8 +94,39 @@ class IngredientEmbedder:
         """Initialize embedder with Supabase client"""
         self.supabase = get_supabase_client()
         self.embedded_count = 0
+        self.skipped_count = 0
         self.failed_count = 0
         self.failed_ingredients = []
+        # Whether the content_hash column exists in the database; set by
+        # _fetch_existing_hashes and checked before writing hashes back
+        self._content_hash_supported = False
+
+    async def _fetch_existing_hashes(self, ids: List[int]) -> Dict[int, str]:
+        """
+        Fetch stored content hashes for the given ingredient ids in one query
+
+        Returns an empty dict on any failure (e.g. the content_hash column
+        hasn't been added yet) so the pipeline falls back to embedding
+        everything rather than aborting
+        """
+        if not ids:
+            return {}
+        try:
+            response = await asyncio.to_thread(
+                lambda: self.supabase.table('ingredients_library').select(
+                    'id, content_hash'
+                ).in_('id', ids).execute()
+            )
+            self._content_hash_supported = True
+            return {
+                row['id']: row['content_hash']
+                for row in (response.data or [])
+                if row.get('content_hash')
+            }
+        except Exception as e:
+            logger.warning(f"Could not fetch existing content hashes, embedding everything: {e}")
+            self._content_hash_supported = False
+            return {}
     
     def load_ingredients(self, file_path: str) -> List[Dict[str, Any]]:
         """
@@ -72,10 +144,14 @@ class IngredientEmbedder:
         """
         try:
             logger.info(f"Loading ingredients from {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            ingredients = data.get('ingredients', [])
+            with open(file_path, 'rb') as f:
+                if ijson is not None:
+                    # Stream items out of the 'ingredients' array one at a
+                    # time; peak memory is the item list, not file + document
+                    ingredients = list(ijson.items(f, 'ingredients.item'))
+                else:
+                    # orjson parses the raw bytes several times faster than stdlib json
+                    ingredients = orjson.loads(f.read()).get('ingredients', [])
             logger.info(f"Successfully loaded {len(ingredients)} ingredients")
             return ingredients
         
@@ -89,84 +165,144 @@ class IngredientEmbedder:
             logger.error(f"Error loading ingredients: {e}")
             raise
     
-    async def generate_embedding(self, text: str, retry_count: int = 0) -> List[float]:
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
-        Generate embedding for text using OpenAI API with retry logic
-        
+        Generate embeddings for a batch of texts in one OpenAI API call
+
+        The embeddings endpoint accepts a list input and returns vectors in
+        input order, so a batch costs a single HTTPS round trip instead of
+        one per text. Rate limits and transient server errors are retried
+        with capped exponential backoff plus jitter (so concurrent batches
+        don't retry in lockstep), honoring a Retry-After header when the
+        API provides one
+
         Args:
-            text: Text to embed
-            retry_count: Current retry attempt number
-            
+            texts: Texts to embed together
+
         Returns:
-            Embedding vector (1536 dimensions)
-            
+            One embedding vector (1536 dimensions) per input text, in order
+
         Raises:
             APIError: If all retry attempts fail
         """
-        try:
-            response = client.embeddings.create(
-                input=text,
-                model=EMBEDDING_MODEL
-            )
-            return response.data[0].embedding
-        
-        except RateLimitError as e:
-            if retry_count < RETRY_ATTEMPTS:
-                wait_time = RETRY_DELAY * (2 ** retry_count)
-                logger.warning(f"Rate limited. Retrying in {wait_time}s (attempt {retry_count + 1}/{RETRY_ATTEMPTS})")
-                await asyncio.sleep(wait_time)
-                return await self.generate_embedding(text, retry_count + 1)
-            else:
-                logger.error(f"Rate limit exceeded after {RETRY_ATTEMPTS} retries for text: {text[:50]}...")
+        last_error: Optional[Exception] = None
+
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            retry_after = None
+            try:
+                response = await _get_openai_client().embeddings.create(
+                    input=texts,
+                    model=EMBEDDING_MODEL
+                )
+                return [item.embedding for item in response.data]
+
+            except RateLimitError as e:
+                last_error = e
+                retry_after = _retry_after_seconds(e)
+
+            except APIError as e:
+                # Only server-side (5xx) errors are transient enough to retry
+                status = getattr(e, 'status_code', None)
+                if status is None or status < 500:
+                    logger.error(f"OpenAI API error: {e}")
+                    raise
+                last_error = e
+
+            except Exception as e:
+                logger.error(f"Unexpected error generating embeddings: {e}")
                 raise
-        
-        except APIError as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise
-        
-        except Exception as e:
-            logger.error(f"Unexpected error generating embedding: {e}")
-            raise
-    
+
+            if attempt >= RETRY_ATTEMPTS:
+                break
+
+            delay = min(RETRY_DELAY * (2 ** attempt) + random.uniform(0, 0.5), RETRY_MAX_DELAY)
+            if retry_after:
+                delay = max(delay, retry_after)
+            logger.warning(
+                f"Transient OpenAI error, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{RETRY_ATTEMPTS}): {last_error}"
+            )
+            await asyncio.sleep(delay)
+
+        logger.error(f"OpenAI request failed after {RETRY_ATTEMPTS} retries for batch of {len(texts)} texts")
+        raise last_error
+
     async def embed_ingredients(self, ingredients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Generate embeddings for all ingredients
-        
+        Generate embeddings for all ingredients, batched per API request
+
         Args:
             ingredients: List of ingredient dictionaries
-            
+
         Returns:
             List of ingredients with embeddings added
         """
-        logger.info(f"Generating embeddings for {len(ingredients)} ingredients")
+        # Skip ingredients whose embedding text is unchanged since the last
+        # run: the stored SHA-256 matching means the existing embedding is
+        # still valid, so re-runs only pay for what actually changed
+        existing_hashes = await self._fetch_existing_hashes(
+            [ing['id'] for ing in ingredients if 'id' in ing]
+        )
+
+        to_embed = []  # (ingredient, text, content_hash)
+        for ingredient in ingredients:
+            # Use name + description as embedding text
+            text = f"{ingredient['name']}: {ingredient['description']}"
+            content_hash = hashlib.sha256(text.encode()).hexdigest()
+            if existing_hashes.get(ingredient.get('id')) == content_hash:
+                self.skipped_count += 1
+                continue
+            to_embed.append((ingredient, text, content_hash))
+
+        if self.skipped_count:
+            logger.info(f"Skipping {self.skipped_count} unchanged ingredients (content hash match)")
+        if not to_embed:
+            logger.info("All ingredients are up to date, nothing to embed")
+            return []
+
+        logger.info(
+            f"Generating embeddings for {len(to_embed)} ingredients "
+            f"in batches of {EMBED_BATCH_SIZE} ({EMBED_BATCH_CONCURRENCY} in flight)"
+        )
+
+        batches = [
+            to_embed[start:start + EMBED_BATCH_SIZE]
+            for start in range(0, len(to_embed), EMBED_BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(EMBED_BATCH_CONCURRENCY)
+
+        async def embed_batch(batch) -> List[List[float]]:
+            async with semaphore:
+                # Small jitter so concurrent batches don't start in lockstep
+                await asyncio.sleep(random.uniform(0, 0.05))
+                return await self.generate_embeddings([text for _, text, _ in batch])
+
+        results = await asyncio.gather(
+            *(embed_batch(batch) for batch in batches),
+            return_exceptions=True
+        )
+
+        # Reassemble in input order; batch order is preserved by gather
         embedded_ingredients = []
-        
-        for i, ingredient in enumerate(ingredients, 1):
-            try:
-                # Use description as embedding text
-                text_to_embed = f"{ingredient['name']}: {ingredient['description']}"
-                
-                logger.debug(f"Embedding {i}/{len(ingredients)}: {ingredient['name']}")
-                embedding = await self.generate_embedding(text_to_embed)
-                
-                # Add embedding to ingredient data
-                ingredient_with_embedding = {
+        for batch, embeddings in zip(batches, results):
+            if isinstance(embeddings, Exception):
+                logger.error(f"Failed to embed batch of {len(batch)} ingredients: {embeddings}")
+                self.failed_count += len(batch)
+                self.failed_ingredients.extend(ing.get('name', 'Unknown') for ing, _, _ in batch)
+                continue
+
+            for (ingredient, _, content_hash), embedding in zip(batch, embeddings):
+                embedded_ingredients.append({
                     **ingredient,
-                    'embedding': embedding
-                }
-                embedded_ingredients.append(ingredient_with_embedding)
-                self.embedded_count += 1
-                
-                # Log progress every 5 ingredients
-                if i % 5 == 0:
-                    logger.info(f"Progress: {i}/{len(ingredients)} embeddings generated")
-            
-            except Exception as e:
-                logger.error(f"Failed to embed ingredient '{ingredient.get('name', 'Unknown')}': {e}")
-                self.failed_count += 1
-                self.failed_ingredients.append(ingredient.get('name', 'Unknown'))
-        
-        logger.info(f"Embedding generation complete: {self.embedded_count} successful, {self.failed_count} failed")
+                    'embedding': embedding,
+                    'content_hash': content_hash
+                })
+            self.embedded_count += len(batch)
+
+        logger.info(
+            f"Embedding generation complete: {self.embedded_count} successful, "
+            f"{self.skipped_count} skipped, {self.failed_count} failed"
+        )
         return embedded_ingredients
     
     async def batch_upsert_to_supabase(self, ingredients: List[Dict[str, Any]]) -> bool:
@@ -193,16 +329,23 @@ class IngredientEmbedder:
                 total_batches = (len(ingredients) + BATCH_SIZE - 1) // BATCH_SIZE
                 
                 try:
-                    # Prepare records for upsert
+                    # Prepare records for upsert. content_hash is only
+                    # written when the select in _fetch_existing_hashes
+                    # proved the column exists - otherwise the upsert would
+                    # fail with an unknown-column error on databases that
+                    # haven't run add_content_hash_column.sql yet
                     records = []
                     for ingredient in batch:
-                        records.append({
+                        record = {
                             'id': ingredient['id'],
                             'name': ingredient['name'],
                             'description': ingredient['description'],
                             'risk_level': ingredient['risk_level'],
                             'embedding': ingredient['embedding']
-                        })
+                        }
+                        if self._content_hash_supported:
+                            record['content_hash'] = ingredient.get('content_hash')
+                        records.append(record)
                     
                     # Upsert batch to Supabase
                     response = self.supabase.table('ingredients_library').upsert(
@@ -211,11 +354,7 @@ class IngredientEmbedder:
                     ).execute()
                     
                     logger.info(f"Batch {batch_num}/{total_batches} upserted successfully ({len(records)} records)")
-                    
-                    # Small delay between batches to avoid overwhelming server
-                    if batch_num < total_batches:
-                        await asyncio.sleep(0.5)
-                
+
                 except Exception as e:
                     logger.error(f"Failed to upsert batch {batch_num}/{total_batches}: {e}")
                     raise
@@ -254,6 +393,9 @@ class IngredientEmbedder:
             embedded_ingredients = await self.embed_ingredients(ingredients)
             
             if not embedded_ingredients:
+                if self.skipped_count and not self.failed_count:
+                    logger.info("All ingredients already embedded and unchanged - nothing to upsert")
+                    return True
                 logger.error("No ingredients were successfully embedded")
                 return False
             
@@ -263,6 +405,7 @@ class IngredientEmbedder:
             logger.info("=" * 60)
             logger.info("EMBEDDING PIPELINE COMPLETED")
             logger.info(f"Successfully embedded: {self.embedded_count}")
+            logger.info(f"Skipped (unchanged): {self.skipped_count}")
             logger.info(f"Failed: {self.failed_count}")
             if self.failed_ingredients:
                 logger.info(f"Failed ingredients: {', '.join(self.failed_ingredients)}")
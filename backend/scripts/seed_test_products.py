@@ -76,15 +76,23 @@ def seed_products():
         
         print("🌱 Seeding test products...")
         print(f"   Products to insert: {len(TEST_PRODUCTS)}")
-        
-        # Insert each product
-        for idx, product in enumerate(TEST_PRODUCTS, 1):
-            try:
-                response = supabase.table('products').insert(product).execute()
-                print(f"   ✓ [{idx}/{len(TEST_PRODUCTS)}] Inserted: {product['brand_name']} (barcode: {product['barcode']})")
-            except Exception as e:
-                print(f"   ✗ [{idx}/{len(TEST_PRODUCTS)}] Failed to insert {product['brand_name']}: {e}")
-        
+
+        # Insert all products in a single bulk request (one network round trip
+        # instead of one per product)
+        try:
+            response = supabase.table('products').insert(TEST_PRODUCTS).execute()
+            inserted = len(response.data) if response.data else 0
+            print(f"   ✓ Bulk inserted {inserted} products")
+        except Exception as bulk_error:
+            # Fall back to per-product inserts so one bad row doesn't block the rest
+            print(f"   ⚠️  Bulk insert failed ({bulk_error}), retrying products individually")
+            for idx, product in enumerate(TEST_PRODUCTS, 1):
+                try:
+                    supabase.table('products').insert(product).execute()
+                    print(f"   ✓ [{idx}/{len(TEST_PRODUCTS)}] Inserted: {product['brand_name']} (barcode: {product['barcode']})")
+                except Exception as e:
+                    print(f"   ✗ [{idx}/{len(TEST_PRODUCTS)}] Failed to insert {product['brand_name']}: {e}")
+
         print("\n✅ Test products seeded successfully!")
         print("\nSample barcodes for testing:")
         for product in TEST_PRODUCTS:
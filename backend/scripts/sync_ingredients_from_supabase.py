@@ -5,19 +5,29 @@ This ensures your local JSON stays in sync with Supabase database
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import random
 import sys
+
+import orjson
 from pathlib import Path
-from typing import List, Dict, Any
-from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import settings
 from utils.supabase_client import get_supabase_client
-from openai import OpenAI, APIError
+from openai import AsyncOpenAI, APIError
+
+# Optional streaming parser for the local JSON (see embed_ingredients.py);
+# falls back to orjson when not installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Configure logging
 logging.basicConfig(
@@ -26,14 +36,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Async OpenAI client, created on first use so importing this module stays
+# cheap (.env loading is already handled by config)
+_openai_client: Optional[AsyncOpenAI] = None
+
+
+def _get_openai_client() -> AsyncOpenAI:
+    """Lazily create and reuse the async OpenAI client"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    return _openai_client
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 # Constants
 EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_CONCURRENCY = 5  # Max in-flight Supabase row updates
+EMBED_BATCH_SIZE = 128  # Inputs per embeddings request (one round trip per batch)
+EMBED_BATCH_CONCURRENCY = 4  # In-flight embedding batches against the OpenAI API
 INGREDIENTS_JSON_PATH = Path(__file__).parent.parent / 'data' / 'ingredients.json'
 
 
@@ -74,9 +94,15 @@ def load_local_ingredients_json() -> Dict[str, Any]:
     try:
         if INGREDIENTS_JSON_PATH.exists():
             logger.info(f"Loading local ingredients.json from {INGREDIENTS_JSON_PATH}")
-            with open(INGREDIENTS_JSON_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+            with open(INGREDIENTS_JSON_PATH, 'rb') as f:
+                if ijson is not None:
+                    # Stream the ingredients array without materializing the
+                    # wrapping document
+                    data = {'ingredients': list(ijson.items(f, 'ingredients.item'))}
+                else:
+                    # orjson parses the raw bytes several times faster than stdlib json
+                    data = orjson.loads(f.read())
+
             # Ensure correct structure
             if 'ingredients' not in data:
                 data = {'ingredients': []}
@@ -127,29 +153,32 @@ def save_ingredients_to_json(ingredients: List[Dict[str, Any]]) -> None:
         raise
 
 
-async def generate_embedding(text: str) -> List[float]:
+async def generate_embeddings(texts: List[str]) -> List[List[float]]:
     """
-    Generate embedding for text using OpenAI API
-    
+    Generate embeddings for a batch of texts in one OpenAI API call
+
+    The embeddings endpoint accepts a list input and returns vectors in
+    input order, collapsing N round trips into one per batch
+
     Args:
-        text: Text to embed
-        
+        texts: Texts to embed together
+
     Returns:
-        Embedding vector (1536 dimensions)
+        One embedding vector (1536 dimensions) per input text, in order
     """
     try:
-        response = client.embeddings.create(
-            input=text,
+        response = await _get_openai_client().embeddings.create(
+            input=texts,
             model=EMBEDDING_MODEL
         )
-        return response.data[0].embedding
-    
+        return [item.embedding for item in response.data]
+
     except APIError as e:
         logger.error(f"OpenAI API error: {e}")
         raise
-    
+
     except Exception as e:
-        logger.error(f"Unexpected error generating embedding: {e}")
+        logger.error(f"Unexpected error generating embeddings: {e}")
         raise
 
 
@@ -177,32 +206,63 @@ async def update_missing_embeddings(ingredients: List[Dict[str, Any]]) -> int:
             return 0
         
         logger.warning(f"Found {len(missing_embeddings)} ingredients without embeddings")
-        
-        # Generate embeddings for missing ones
-        updated_count = 0
-        for i, ing in enumerate(missing_embeddings, 1):
-            try:
-                logger.info(f"Generating embedding {i}/{len(missing_embeddings)}: {ing['name']}")
-                
+
+        # Embed whole batches in a single API call each, then write the
+        # rows back concurrently under a bounded semaphore
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def update_row(ing: Dict[str, Any], embedding: List[float]) -> bool:
+            async with semaphore:
+                try:
+                    # Store the content hash with the embedding so re-runs of
+                    # the embedding scripts can skip this row while unchanged
+                    text = f"{ing['name']}: {ing.get('description', '')}"
+                    # Update in Supabase (blocking client, run off the event loop)
+                    await asyncio.to_thread(
+                        lambda: supabase.table('ingredients_library').update({
+                            'embedding': embedding,
+                            'content_hash': hashlib.sha256(text.encode()).hexdigest()
+                        }).eq('id', ing['id']).execute()
+                    )
+
+                    logger.info(f"✅ Updated embedding for '{ing['name']}'")
+                    return True
+
+                except Exception as e:
+                    logger.error(f"Failed to update embedding for '{ing['name']}': {e}")
+                    return False
+
+        batches = [
+            missing_embeddings[start:start + EMBED_BATCH_SIZE]
+            for start in range(0, len(missing_embeddings), EMBED_BATCH_SIZE)
+        ]
+        batch_semaphore = asyncio.Semaphore(EMBED_BATCH_CONCURRENCY)
+
+        async def embed_batch(batch: List[Dict[str, Any]]) -> List[List[float]]:
+            async with batch_semaphore:
+                # Small jitter so concurrent batches don't start in lockstep
+                await asyncio.sleep(random.uniform(0, 0.05))
                 # Combine name and description for embedding
-                text_to_embed = f"{ing['name']}: {ing.get('description', '')}"
-                embedding = await generate_embedding(text_to_embed)
-                
-                # Update in Supabase
-                supabase.table('ingredients_library').update({
-                    'embedding': embedding
-                }).eq('id', ing['id']).execute()
-                
-                logger.info(f"✅ Updated embedding for '{ing['name']}'")
-                updated_count += 1
-                
-                # Small delay to avoid rate limits
-                await asyncio.sleep(0.5)
-            
-            except Exception as e:
-                logger.error(f"Failed to generate embedding for '{ing['name']}': {e}")
+                texts = [f"{ing['name']}: {ing.get('description', '')}" for ing in batch]
+                return await generate_embeddings(texts)
+
+        embeddings_per_batch = await asyncio.gather(
+            *(embed_batch(batch) for batch in batches),
+            return_exceptions=True
+        )
+
+        update_tasks = []
+        for batch, embeddings in zip(batches, embeddings_per_batch):
+            if isinstance(embeddings, Exception):
+                logger.error(f"Failed to embed batch of {len(batch)} ingredients: {embeddings}")
                 continue
-        
+            update_tasks.extend(
+                update_row(ing, emb) for ing, emb in zip(batch, embeddings)
+            )
+
+        results = await asyncio.gather(*update_tasks)
+        updated_count = sum(results)
+
         logger.info(f"✅ Generated {updated_count} new embeddings")
         return updated_count
     
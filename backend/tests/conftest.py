@@ -484,7 +484,6 @@ def mock_environment(patch_supabase_client, patch_all_openai):
     }
 
 
-@pytest.fixture
 def pytest_configure(config):
     """
     Configure pytest markers
@@ -5,10 +5,18 @@ Queries products table by barcode and retrieves ingredient information
 
 import logging
 from typing import Optional, List, Dict, Any
+from cachetools import TTLCache
 from utils.supabase_client import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Product rows are effectively immutable, so resolved lookups are cached
+# in-process per barcode; misses get a short negative cache so bursts of
+# the same unknown barcode (scanner typos) don't hammer the database.
+# Only touched from the event loop, so no lock is needed
+_product_cache = TTLCache(maxsize=2048, ttl=300)
+_negative_cache = TTLCache(maxsize=512, ttl=30)
+
 
 class BarcodeLookupError(Exception):
     """Custom exception for barcode lookup operations"""
@@ -39,13 +47,23 @@ async def lookup_product_by_barcode(barcode: str) -> Optional[Dict[str, Any]]:
         BarcodeLookupError: If database query fails
     """
     try:
-        if not barcode or not barcode.strip():
+        # Router input arrives pre-stripped via the request model; this
+        # single strip guards direct callers without a second allocation
+        barcode = barcode.strip() if barcode else ""
+        if not barcode:
             logger.warning("Empty barcode provided")
             raise BarcodeLookupError("Barcode cannot be empty")
-        
-        barcode = barcode.strip()
-        logger.info(f"Looking up barcode: {barcode}")
-        
+
+        cached = _product_cache.get(barcode)
+        if cached is not None:
+            logger.debug("Barcode cache hit: %s", barcode)
+            return cached
+        if barcode in _negative_cache:
+            logger.debug("Barcode negative-cache hit: %s", barcode)
+            return None
+
+        logger.info("Looking up barcode: %s", barcode)
+
         supabase = get_supabase_client()
         
         # Query products table by barcode
@@ -54,11 +72,14 @@ async def lookup_product_by_barcode(barcode: str) -> Optional[Dict[str, Any]]:
         ).eq('barcode', barcode).execute()
         
         if not response.data or len(response.data) == 0:
-            logger.info(f"No product found for barcode: {barcode}")
+            logger.info("No product found for barcode: %s", barcode)
+            _negative_cache[barcode] = True
             return None
         
         product = response.data[0]
-        logger.debug(f"Found product: {product}")
+        # Repr of the full row is not free; only build it when DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found product: %s", product)
         
         # Convert ingredient IDs to ingredient names
         ingredient_ids = product.get('ingredients', [])
@@ -67,9 +88,9 @@ async def lookup_product_by_barcode(barcode: str) -> Optional[Dict[str, Any]]:
         if ingredient_ids and len(ingredient_ids) > 0:
             try:
                 ingredient_names = await _get_ingredient_names(ingredient_ids)
-                logger.debug(f"Resolved {len(ingredient_names)} ingredients")
+                logger.debug("Resolved %s ingredients", len(ingredient_names))
             except Exception as e:
-                logger.warning(f"Failed to resolve ingredient names: {e}")
+                logger.warning("Failed to resolve ingredient names: %s", e)
                 # Continue without ingredient names rather than failing completely
         
         # Format response
@@ -83,13 +104,14 @@ async def lookup_product_by_barcode(barcode: str) -> Optional[Dict[str, Any]]:
             "research_count": product.get('research_count')
         }
         
-        logger.info(f"Successfully resolved product: {result['brand_name']}")
+        _product_cache[barcode] = result
+        logger.info("Successfully resolved product: %s", result['brand_name'])
         return result
     
     except BarcodeLookupError:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in barcode lookup: {e}", exc_info=True)
+        logger.error("Unexpected error in barcode lookup: %s", e, exc_info=True)
         raise BarcodeLookupError(f"Failed to lookup barcode: {e}")
 
 
@@ -118,7 +140,7 @@ async def _get_ingredient_names(ingredient_ids: List[int]) -> List[str]:
         ).in_('id', ingredient_ids).execute()
         
         if not response.data:
-            logger.warning(f"No ingredients found for IDs: {ingredient_ids}")
+            logger.warning("No ingredients found for IDs: %s", ingredient_ids)
             return []
         
         # Create ID to name mapping
@@ -130,7 +152,7 @@ async def _get_ingredient_names(ingredient_ids: List[int]) -> List[str]:
         return ingredient_names
     
     except Exception as e:
-        logger.error(f"Error resolving ingredient names: {e}")
+        logger.error("Error resolving ingredient names: %s", e)
         raise
 
 
@@ -3,6 +3,7 @@ OCR utility for extracting ingredients from product images
 Uses OpenAI's GPT-4o-mini vision model to read ingredient lists
 """
 
+import asyncio
 import logging
 import json
 from typing import List, Optional
@@ -59,29 +60,33 @@ async def extract_ingredients_from_image(image_data: bytes) -> List[str]:
         
         logger.debug(f"Detected image format: {image_format}")
         
-        # Call OpenAI GPT-4o-mini with vision capability
-        response = client.messages.create(
-            model=VISION_MODEL,
-            max_tokens=1024,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": f"image/{image_format}",
-                                "data": base64_image
+        # Call OpenAI GPT-4o-mini with vision capability. The sync client
+        # blocks for the full vision round trip, so it runs in a worker
+        # thread to keep the event loop free for concurrent scans
+        response = await asyncio.to_thread(
+            lambda: client.messages.create(
+                model=VISION_MODEL,
+                max_tokens=1024,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image",
+                                "source": {
+                                    "type": "base64",
+                                    "media_type": f"image/{image_format}",
+                                    "data": base64_image
+                                }
+                            },
+                            {
+                                "type": "text",
+                                "text": EXTRACTION_PROMPT
                             }
-                        },
-                        {
-                            "type": "text",
-                            "text": EXTRACTION_PROMPT
-                        }
-                    ]
-                }
-            ]
+                        ]
+                    }
+                ]
+            )
         )
         
         # Extract response content
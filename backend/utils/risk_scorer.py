@@ -141,10 +141,14 @@ async def _fetch_user_sensitivities(user_id: str) -> List[str]:
         # Query profiles table for user sensitivities
         try:
             logger.info(f"Attempting to fetch profile for user: {user_id}")
-            response = supabase.table('profiles').select(
-                'sensitivities'
-            ).eq('user_id', user_id).single().execute()
-            
+            # Worker thread: the sync client call would otherwise block the
+            # event loop and defeat the gather() with the vector search
+            response = await asyncio.to_thread(
+                lambda: supabase.table('profiles').select(
+                    'sensitivities'
+                ).eq('user_id', user_id).single().execute()
+            )
+
             if response.data:
                 sensitivities = response.data.get('sensitivities', [])
                 logger.info(f"✓ Profile found for user {user_id} - loaded sensitivities")
@@ -219,8 +223,10 @@ async def _create_user_profile(user_id: str) -> List[str]:
             'price_range': ''
         }
         
-        response = supabase.table('profiles').insert(profile_data).execute()
-        
+        response = await asyncio.to_thread(
+            lambda: supabase.table('profiles').insert(profile_data).execute()
+        )
+
         if response.data:
             logger.info(f"✓ Successfully created profile for user: {user_id}")
             logger.debug(f"New profile data: {response.data}")
@@ -238,10 +244,12 @@ async def _create_user_profile(user_id: str) -> List[str]:
             logger.info(f"Profile already exists for user {user_id} (race condition resolved)")
             try:
                 supabase = get_supabase_client()
-                response = supabase.table('profiles').select(
-                    'sensitivities'
-                ).eq('user_id', user_id).single().execute()
-                
+                response = await asyncio.to_thread(
+                    lambda: supabase.table('profiles').select(
+                        'sensitivities'
+                    ).eq('user_id', user_id).single().execute()
+                )
+
                 if response.data:
                     sensitivities = response.data.get('sensitivities', [])
                     if isinstance(sensitivities, str):
@@ -280,17 +288,47 @@ async def _search_all_ingredients(
     try:
         if not ingredient_names:
             return []
-        
+
+        # Deduplicate (case-insensitive, order-preserving) so repeated OCR
+        # tokens are embedded and searched only once
+        seen_names = set()
+        unique_names = []
+        for name in ingredient_names:
+            key = name.strip().lower() if isinstance(name, str) else name
+            if key and key not in seen_names:
+                seen_names.add(key)
+                unique_names.append(name.strip() if isinstance(name, str) else name)
+        ingredient_names = unique_names
+
+        if not ingredient_names:
+            return []
+
         logger.info(f"Starting parallelized vector search for {len(ingredient_names)} ingredients")
-        
+
+        # Generate embeddings for all ingredients in ONE OpenAI API call,
+        # then fan the searches out with the embeddings precomputed.
+        # Falls back to per-ingredient embedding if the batch call fails.
+        query_embeddings: List[Optional[List[float]]] = [None] * len(ingredient_names)
+        try:
+            batch_embeddings = await generate_batch_embeddings(ingredient_names)
+            if len(batch_embeddings) == len(ingredient_names):
+                query_embeddings = batch_embeddings
+            else:
+                logger.warning(
+                    f"Batch embedding count mismatch ({len(batch_embeddings)} != {len(ingredient_names)}), "
+                    "falling back to per-ingredient embedding"
+                )
+        except Exception as batch_error:
+            logger.warning(f"Batch embedding generation failed, falling back to per-ingredient: {batch_error}")
+
         # Create parallel search tasks for all ingredients
-        # Each search_similar_ingredients call generates its own embedding
         search_tasks = [
             search_similar_ingredients(
                 query=ingredient,
-                limit=max_results_per_ingredient
+                limit=max_results_per_ingredient,
+                query_embedding=embedding
             )
-            for ingredient in ingredient_names
+            for ingredient, embedding in zip(ingredient_names, query_embeddings)
         ]
         
         # Execute all searches in parallel with error handling
@@ -356,22 +394,27 @@ async def _generate_llm_assessment(
         )
         
         logger.debug("Calling OpenAI LLM for risk assessment")
-        
-        # Call OpenAI API with health expert system prompt
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            max_tokens=1024,
-            temperature=0.7,
-            messages=[
-                {
-                    "role": "system",
-                    "content": HEALTH_EXPERT_SYSTEM_PROMPT
-                },
-                {
-                    "role": "user",
-                    "content": user_prompt
-                }
-            ]
+
+        # Call OpenAI API with health expert system prompt. The sync client
+        # blocks for the full completion round trip, so it runs in a worker
+        # thread - otherwise every concurrent scan on this worker would
+        # serialize behind the slowest LLM call
+        response = await asyncio.to_thread(
+            lambda: client.chat.completions.create(
+                model="gpt-4o-mini",
+                max_tokens=1024,
+                temperature=0.7,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": HEALTH_EXPERT_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": user_prompt
+                    }
+                ]
+            )
         )
         
         # Extract response text
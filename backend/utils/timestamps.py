@@ -0,0 +1,31 @@
+"""
+Timestamp helpers for API responses and logging
+Avoids building datetime objects on hot paths like health probes
+"""
+
+import time
+
+# Last formatted second, cached: load balancers hit /health several times a
+# second, and re-formatting the same second over and over is wasted work
+_last_second = 0
+_last_iso = ""
+
+
+def utc_now_iso() -> str:
+    """
+    Current UTC time as an ISO8601 string with 'Z' suffix, second resolution
+
+    Returns:
+        Timestamp string like '2026-08-28T18:30:00Z'
+    """
+    global _last_second, _last_iso
+
+    second = int(time.time())
+    if second != _last_second:
+        s = time.gmtime(second)
+        _last_iso = (
+            f"{s.tm_year:04d}-{s.tm_mon:02d}-{s.tm_mday:02d}"
+            f"T{s.tm_hour:02d}:{s.tm_min:02d}:{s.tm_sec:02d}Z"
+        )
+        _last_second = second
+    return _last_iso
@@ -3,15 +3,23 @@ Vector search utility for querying similar ingredients from Supabase
 Implements semantic search using embeddings stored in vector database
 """
 
+import asyncio
 import logging
 import sys
 import threading
 from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+import numpy as np
 from openai import OpenAI, APIError
 from cachetools import TTLCache
 
+# Optional SIMD-accelerated cosine kernel; falls back to NumPy when absent
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -32,10 +40,83 @@ MAX_SEARCH_LIMIT = 20
 # Embedding cache: permanent, LRU-based (embeddings never change)
 _embedding_cache_lock = threading.Lock()
 
+# On-disk embedding cache: survives process restarts so cold starts don't
+# re-embed queries already paid for (best effort - skipped on read-only
+# filesystems such as Vercel's deployment bundle)
+_EMBEDDING_CACHE_PATH = Path(__file__).parent.parent / 'data' / 'query_embedding_cache.json'
+_disk_embedding_cache: Optional[Dict[str, List[float]]] = None
+
+
+def _load_disk_embedding_cache() -> Dict[str, List[float]]:
+    """Load the persisted query -> embedding cache, once per process"""
+    global _disk_embedding_cache
+
+    if _disk_embedding_cache is None:
+        import json
+        try:
+            with open(_EMBEDDING_CACHE_PATH, 'r', encoding='utf-8') as f:
+                _disk_embedding_cache = json.load(f)
+            logger.info(f"Loaded {len(_disk_embedding_cache)} cached query embeddings from disk")
+        except FileNotFoundError:
+            _disk_embedding_cache = {}
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache from disk: {e}")
+            _disk_embedding_cache = {}
+
+    return _disk_embedding_cache
+
+
+def _persist_disk_embedding_cache() -> None:
+    """Write the embedding cache back to disk (best effort)"""
+    if _disk_embedding_cache is None:
+        return
+
+    import json
+    try:
+        with open(_EMBEDDING_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(_disk_embedding_cache, f)
+    except OSError as e:
+        # Read-only filesystem (e.g. serverless) - in-memory caching still applies
+        logger.debug(f"Skipping embedding cache persistence: {e}")
+
+# Exact-name index over the bundled ingredient library: scanned strings that
+# already match a library name verbatim ("Rayon", "Cotton") skip embedding
+# generation and the database round trip entirely
+_INGREDIENTS_JSON_PATH = Path(__file__).parent.parent / 'data' / 'ingredients.json'
+_exact_name_index: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def _get_exact_name_index() -> Dict[str, Dict[str, Any]]:
+    """Build (once) the lowercased name -> ingredient record index"""
+    global _exact_name_index
+
+    if _exact_name_index is None:
+        import json
+        try:
+            with open(_INGREDIENTS_JSON_PATH, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _exact_name_index = {
+                ingredient['name'].strip().lower(): ingredient
+                for ingredient in data.get('ingredients', [])
+                if ingredient.get('name')
+            }
+        except Exception as e:
+            logger.warning(f"Could not build exact-name ingredient index: {e}")
+            _exact_name_index = {}
+
+    return _exact_name_index
+
 # Vector search cache: TTL-based, 1 hour expiry (recipe data rarely changes)
 _vector_search_cache = TTLCache(maxsize=500, ttl=3600)
 _vector_search_cache_lock = threading.Lock()
 
+# Fallback-search matrix cache: the pre-normalized ingredient embedding
+# matrix, stored as float16 to halve memory and bandwidth (similarities are
+# still accumulated in float32). Rebuilt after the TTL expires.
+_FALLBACK_MATRIX_TTL = 3600
+_fallback_matrix_cache: Optional[Dict[str, Any]] = None
+_fallback_matrix_lock = threading.Lock()
+
 
 class VectorSearchError(Exception):
     """Custom exception for vector search operations"""
@@ -59,16 +140,26 @@ def _generate_embedding_cached(query: str) -> str:
     """
     try:
         import json
-        
+
+        # Check the persisted cache before paying for an API call
+        disk_cache = _load_disk_embedding_cache()
+        cached = disk_cache.get(query.strip())
+        if cached is not None:
+            return json.dumps(cached)
+
         response = client.embeddings.create(
             input=query.strip(),
             model=EMBEDDING_MODEL
         )
         embedding = response.data[0].embedding
-        
+
+        # Persist for future cold starts
+        disk_cache[query.strip()] = embedding
+        _persist_disk_embedding_cache()
+
         # Return as JSON string for caching (since lists aren't hashable)
         return json.dumps(embedding)
-    
+
     except Exception as e:
         logger.error(f"Error in cached embedding generation: {e}")
         raise
@@ -151,8 +242,10 @@ async def generate_batch_embeddings(queries: List[str]) -> List[List[float]]:
         
         logger.debug(f"Generating batch embeddings for {len(valid_queries)} queries")
         
-        # OpenAI API supports batch embedding generation
-        response = client.embeddings.create(
+        # OpenAI API supports batch embedding generation; the sync client
+        # call runs in a worker thread so it doesn't block the event loop
+        response = await asyncio.to_thread(
+            client.embeddings.create,
             input=valid_queries,
             model=EMBEDDING_MODEL
         )
@@ -175,17 +268,20 @@ async def generate_batch_embeddings(queries: List[str]) -> List[List[float]]:
 async def search_similar_ingredients(
     query: str,
     limit: int = DEFAULT_SEARCH_LIMIT,
-    risk_level_filter: Optional[str] = None
+    risk_level_filter: Optional[str] = None,
+    query_embedding: Optional[List[float]] = None
 ) -> List[Dict[str, Any]]:
     """
     Search for similar ingredients using semantic vector similarity with caching.
     Results are cached for 1 hour since ingredient database rarely changes.
-    
+
     Args:
         query: Search query string (e.g., "fragrance effects", "synthetic fibers")
         limit: Maximum number of results to return (1-20, default 5)
         risk_level_filter: Optional filter by risk level ('Low', 'Medium', 'High')
-        
+        query_embedding: Optional precomputed embedding for the query
+            (e.g., from generate_batch_embeddings); skips the per-query API call
+
     Returns:
         List of matching ingredients sorted by similarity score (highest first)
         Each result includes: id, name, description, risk_level, similarity_score
@@ -213,9 +309,28 @@ async def search_similar_ingredients(
                 return _vector_search_cache[cache_key]
         
         logger.info(f"Vector search cache MISS, searching: query='{query}', limit={limit}")
-        
-        # Generate embedding for query
-        query_embedding = await generate_query_embedding(query)
+
+        # Short-circuit: if the query is a verbatim library ingredient name,
+        # return it directly instead of paying for embedding + similarity
+        exact_match = _get_exact_name_index().get(query.strip().lower()) if query else None
+        if exact_match is not None and (
+            not risk_level_filter or exact_match.get('risk_level') == risk_level_filter
+        ):
+            logger.info(f"Exact library match for '{query}', skipping embedding search")
+            results = [{
+                'id': exact_match.get('id'),
+                'name': exact_match.get('name'),
+                'description': exact_match.get('description', ''),
+                'risk_level': exact_match.get('risk_level'),
+                'similarity_score': 1.0
+            }]
+            with _vector_search_cache_lock:
+                _vector_search_cache[cache_key] = results
+            return results
+
+        # Generate embedding for query unless one was precomputed in batch
+        if query_embedding is None:
+            query_embedding = await generate_query_embedding(query)
         
         # Get Supabase client
         supabase = get_supabase_client()
@@ -223,15 +338,19 @@ async def search_similar_ingredients(
         # Perform vector similarity search using Supabase RPC
         # Note: Requires 'search_ingredients' RPC function in Supabase
         try:
-            response = supabase.rpc(
-                'search_ingredients',
-                {
-                    'query_embedding': query_embedding,
-                    'match_limit': limit,
-                    'match_threshold': 0.1  # Minimum similarity threshold
-                }
-            ).execute()
-            
+            # Worker thread: the sync client call would otherwise block the
+            # event loop and serialize the gathered per-ingredient searches
+            response = await asyncio.to_thread(
+                lambda: supabase.rpc(
+                    'search_ingredients',
+                    {
+                        'query_embedding': query_embedding,
+                        'match_limit': limit,
+                        'match_threshold': 0.1  # Minimum similarity threshold
+                    }
+                ).execute()
+            )
+
             results = response.data if response.data else []
             
             # Apply risk level filter if specified
@@ -266,6 +385,67 @@ async def search_similar_ingredients(
         raise VectorSearchError(f"Vector search failed: {e}")
 
 
+def _get_fallback_matrix() -> tuple:
+    """
+    Fetch all library embeddings and build the pre-normalized similarity
+    matrix, cached for _FALLBACK_MATRIX_TTL seconds
+
+    Returns:
+        Tuple of (candidates, matrix, scores_buf) where candidates is the
+        list of ingredient dicts with embeddings, matrix is the float16
+        row-normalized embedding matrix aligned with it, and scores_buf is
+        a reusable float32 output buffer for unfiltered similarity scoring
+    """
+    global _fallback_matrix_cache
+
+    import time
+
+    with _fallback_matrix_lock:
+        cache = _fallback_matrix_cache
+        if cache is not None and (time.time() - cache['built_at']) < _FALLBACK_MATRIX_TTL:
+            return cache['candidates'], cache['matrix'], cache['scores_buf']
+
+    supabase = get_supabase_client()
+
+    # Fetch all ingredients with embeddings
+    response = supabase.table('ingredients_library').select(
+        'id, name, description, risk_level, embedding'
+    ).execute()
+
+    ingredients = response.data if response.data else []
+    candidates = [ingredient for ingredient in ingredients if ingredient.get('embedding')]
+
+    if not candidates:
+        return [], None, None
+
+    # Normalize rows once so cosine similarity collapses to a single
+    # matrix-vector product, then downcast to float16: half the memory and
+    # bandwidth, while similarity scoring accumulates in float32
+    emb_matrix = np.asarray([c['embedding'] for c in candidates], dtype=np.float32)
+    # einsum computes row norms without materializing the N x 1536 squared
+    # temporary that np.linalg.norm(axis=1) allocates
+    emb_norms = np.sqrt(np.einsum('ij,ij->i', emb_matrix, emb_matrix))
+    emb_norms[emb_norms == 0] = 1.0
+    emb_matrix /= emb_norms[:, np.newaxis]
+    # Guarantee C-contiguous row-major layout so the matmul hits the BLAS
+    # SGEMV fast path instead of a strided gather
+    emb_matrix = np.ascontiguousarray(emb_matrix.astype(np.float16))
+
+    # Preallocated once per matrix build and reused by every unfiltered
+    # search, so scoring doesn't allocate a fresh output array per query
+    scores_buf = np.empty(len(candidates), dtype=np.float32)
+
+    with _fallback_matrix_lock:
+        _fallback_matrix_cache = {
+            'built_at': time.time(),
+            'candidates': candidates,
+            'matrix': emb_matrix,
+            'scores_buf': scores_buf
+        }
+
+    return candidates, emb_matrix, scores_buf
+
+
 async def _fallback_search(
     query_embedding: List[float],
     limit: int,
@@ -285,38 +465,51 @@ async def _fallback_search(
     """
     try:
         logger.debug("Executing fallback table scan search")
-        
-        supabase = get_supabase_client()
-        
-        # Fetch all ingredients with embeddings
-        response = supabase.table('ingredients_library').select(
-            'id, name, description, risk_level, embedding'
-        ).execute()
-        
-        ingredients = response.data if response.data else []
-        
-        if not ingredients:
+
+        # Worker thread: on a cache miss this fetches the whole library and
+        # builds the normalized matrix, neither of which belongs on the loop
+        candidates, emb_matrix, scores_buf = await asyncio.to_thread(_get_fallback_matrix)
+
+        if not candidates:
             logger.warning("No ingredients found in database")
             return []
-        
-        # Calculate similarity scores using cosine similarity
-        results_with_scores = []
-        for ingredient in ingredients:
-            if ingredient.get('embedding'):
-                similarity = _cosine_similarity(query_embedding, ingredient['embedding'])
-                
-                # Apply risk level filter
-                if risk_level_filter and ingredient.get('risk_level') != risk_level_filter:
-                    continue
-                
-                results_with_scores.append({
-                    'id': ingredient['id'],
-                    'name': ingredient['name'],
-                    'description': ingredient['description'],
-                    'risk_level': ingredient['risk_level'],
-                    'similarity_score': similarity
-                })
-        
+
+        # Apply the risk filter by selecting matrix rows, so excluded
+        # ingredients are never scored
+        if risk_level_filter:
+            scores_buf = None
+            keep = [
+                i for i, candidate in enumerate(candidates)
+                if candidate.get('risk_level') == risk_level_filter
+            ]
+            if not keep:
+                return []
+            candidates = [candidates[i] for i in keep]
+            emb_matrix = emb_matrix[keep]
+
+        query_vec = np.ascontiguousarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vec)
+        if query_norm > 0:
+            query_vec /= query_norm
+
+        # float16 matrix, float32 accumulation; the cached buffer is only
+        # written and read between awaits, so event-loop callers never race
+        if scores_buf is not None:
+            similarities = np.matmul(emb_matrix, query_vec, dtype=np.float32, out=scores_buf)
+        else:
+            similarities = np.matmul(emb_matrix, query_vec, dtype=np.float32)
+
+        results_with_scores = [
+            {
+                'id': ingredient['id'],
+                'name': ingredient['name'],
+                'description': ingredient['description'],
+                'risk_level': ingredient['risk_level'],
+                'similarity_score': float(similarity)
+            }
+            for ingredient, similarity in zip(candidates, similarities)
+        ]
+
         # Sort by similarity score and limit results
         results_with_scores.sort(key=lambda x: x['similarity_score'], reverse=True)
         return results_with_scores[:limit]
@@ -328,26 +521,35 @@ async def _fallback_search(
 
 def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """
-    Calculate cosine similarity between two vectors
-    
+    Calculate cosine similarity between two vectors using NumPy
+    Vectorized replacement for the previous pure-Python sum/zip loops,
+    which were interpreter-bound on 1536-dimension OpenAI embeddings
+
     Args:
         vec1: First vector (query embedding)
         vec2: Second vector (ingredient embedding)
-        
+
     Returns:
         Cosine similarity score (0-1)
     """
-    if not vec1 or not vec2 or len(vec1) != len(vec2):
+    if vec1 is None or vec2 is None or len(vec1) == 0 or len(vec2) == 0 or len(vec1) != len(vec2):
         return 0.0
-    
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    magnitude1 = sum(a ** 2 for a in vec1) ** 0.5
-    magnitude2 = sum(b ** 2 for b in vec2) ** 0.5
-    
-    if magnitude1 == 0 or magnitude2 == 0:
+
+    a = np.asarray(vec1, dtype=np.float32)
+    b = np.asarray(vec2, dtype=np.float32)
+
+    # Prefer the SIMD kernel when installed (simsimd returns cosine distance)
+    if simsimd is not None:
+        distance = float(simsimd.cosine(a, b))
+        if not np.isnan(distance):
+            return 1.0 - distance
+
+    denominator = np.sqrt(np.vdot(a, a) * np.vdot(b, b))
+
+    if denominator == 0:
         return 0.0
-    
-    return dot_product / (magnitude1 * magnitude2)
+
+    return float(np.dot(a, b) / denominator)
 
 
 async def search_by_name(
@@ -484,7 +686,6 @@ def search_sync(
     Returns:
         List of matching ingredients
     """
-    import asyncio
     try:
         loop = asyncio.get_event_loop()
     except RuntimeError: